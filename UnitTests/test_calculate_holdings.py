@@ -6,7 +6,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from src.calculate_holdings import (
-    calculate_holdings, calculate_growth, rebalance_portfolio,
+    calculate_holdings, calculate_holdings_batch, calculate_growth, rebalance_portfolio, make_rebalance_fn,
     get_benchmark_return, calculate_information_ratio
 )
 from src.factor_function import Momentum6m, ROE, ROA
@@ -98,8 +98,90 @@ class TestCalculateHoldings:
         # Should only include stocks with valid values
         selected_tickers = [inv['ticker'] for inv in portfolio.investments]
         assert 'MSFT' not in selected_tickers
-    
-    @pytest.mark.skip(reason="Fossil fuel filtering needs fixing in calculate_holdings")
+
+    def test_calculate_holdings_sees_updated_factor_values(self, market):
+        """Test that editing a market's factor column in place changes the next selection"""
+        factor = Momentum6m()
+        first = calculate_holdings(factor, 10000.0, market)
+        market.stocks.loc[:, '6-Mo Momentum %'] = -market.stocks['6-Mo Momentum %']
+        second = calculate_holdings(factor, 10000.0, market)
+
+        assert [inv['ticker'] for inv in first.investments] == ['TSLA']
+        assert [inv['ticker'] for inv in second.investments] == ['WMT']
+
+    def test_calculate_holdings_duplicate_tickers(self):
+        """Test that a ticker listed in two regions is held once and fills one slot"""
+        data = pd.DataFrame({
+            'Ticker-Region': ['AAA-US', 'AAA-CA', 'BBB-US', 'CCC-US'],
+            'Ending Price': [10.0, 10.0, 20.0, 30.0],
+            '6-Mo Momentum %': [0.50, 0.40, 0.30, 0.10],
+            'Year': [2022] * 4
+        })
+        market = MarketObject(data, 2022)
+
+        portfolio = calculate_holdings(Momentum6m(), 10000.0, market, top_pct=70)
+
+        assert [inv['ticker'] for inv in portfolio.investments] == ['AAA', 'BBB']
+        assert portfolio.investments[0]['number_of_shares'] == pytest.approx(500.0)
+
+    def test_calculate_holdings_batch_matches_single(self, market):
+        """Test batched holdings match per-factor calculate_holdings"""
+        market.stocks['ROE using 9/30 Data'] = np.linspace(0.05, 0.5, len(market.stocks))
+        factors = [Momentum6m(), ROE()]
+
+        batch = calculate_holdings_batch(factors, 5000.0, market)
+        single = [calculate_holdings(factor, 5000.0, market) for factor in factors]
+
+        assert [p.investments for p in batch] == [p.investments for p in single]
+
+    def test_calculate_holdings_market_cap_weight(self):
+        """Test market-cap weighting allocates AUM in proportion to cap"""
+        data = pd.DataFrame({
+            'Ticker-Region': ['AAA-US', 'BBB-US', 'CCC-US', 'DDD-US'],
+            'Ending Price': [10.0, 20.0, 30.0, 40.0],
+            '6-Mo Momentum %': [0.40, 0.30, 0.20, 0.10],
+            'Market Capitalization': [100.0, 300.0, 50.0, 50.0],
+            'Year': [2022, 2022, 2022, 2022]
+        })
+        market = MarketObject(data, 2022)
+
+        portfolio = calculate_holdings(Momentum6m(), 1000.0, market, top_pct=50, use_market_cap_weight=True)
+
+        holdings = {inv['ticker']: inv['number_of_shares'] for inv in portfolio.investments}
+        assert holdings == pytest.approx({'AAA': 250.0 / 10.0, 'BBB': 750.0 / 20.0})
+
+    def test_calculate_holdings_ties_keep_frame_order(self):
+        """Test that tied factor scores are selected in market frame order"""
+        data = pd.DataFrame({
+            'Ticker-Region': ['AAA-US', 'BBB-US', 'CCC-US', 'DDD-US'],
+            'Ending Price': [10.0, 20.0, 30.0, 40.0],
+            '6-Mo Momentum %': [0.10, 0.30, 0.30, 0.20],
+            'Year': [2022, 2022, 2022, 2022]
+        })
+        market = MarketObject(data, 2022)
+
+        portfolio = calculate_holdings(Momentum6m(), 10000.0, market, top_pct=50)
+
+        assert [inv['ticker'] for inv in portfolio.investments] == ['BBB', 'CCC']
+
+    def test_calculate_holdings_custom_factor_fallback(self, market):
+        """Test per-ticker fallback for factors without a matching column"""
+        class CustomFactor:
+            column_name = 'Custom Score'
+
+            def __init__(self):
+                self.calls = 0
+
+            def get(self, ticker, market):
+                self.calls += 1
+                return {'AAPL': np.int64(3), 'MSFT': np.nan, 'GOOGL': 1.0}.get(ticker)
+
+        factor = CustomFactor()
+        portfolio = calculate_holdings(factor, 10000.0, market, top_pct=50)
+
+        assert factor.calls == len(market.stocks.index)
+        assert [inv['ticker'] for inv in portfolio.investments] == ['AAPL']
+
     def test_calculate_holdings_fossil_fuel_restriction(self):
         """Test fossil fuel restriction"""
         data = pd.DataFrame({
@@ -119,6 +201,8 @@ class TestCalculateHoldings:
         assert 'XOM' not in selected_tickers, f"XOM should be excluded but found in {selected_tickers}"
         # Should select from non-fossil fuel companies
         assert len(selected_tickers) > 0, "Should have selected some companies"
+        # The market itself is left unfiltered
+        assert 'XOM' in market.stocks.index
 
 
 class TestCalculateGrowth:
@@ -253,6 +337,21 @@ class TestRebalancePortfolio:
         assert results['final_value'] > 0
         assert len(results['yearly_returns']) == 2  # 2 years of returns
     
+    def test_make_rebalance_fn_matches_rebalance(self, sample_data):
+        """Test the specialized backtest replays rebalance_portfolio values"""
+        factors = [Momentum6m(), ROE(), ROA()]
+
+        results = rebalance_portfolio(
+            sample_data, factors,
+            start_year=2020, end_year=2022,
+            initial_aum=1000.0,
+            verbosity=0
+        )
+        rebalance_fn = make_rebalance_fn(sample_data, factors, start_year=2020, end_year=2022)
+
+        assert rebalance_fn(1000.0) == pytest.approx(results['portfolio_values'])
+        assert rebalance_fn(1000.0, weights=[1.0, 0.0, 0.0])[0] == 1000.0
+
     def test_rebalance_portfolio_returns_structure(self, sample_data):
         """Test that rebalance returns correct structure"""
         factors = [Momentum6m()]
@@ -12,6 +12,7 @@ from src.factor_function import (
     OneYrCapEXGrowth, BookPrice, NextYrReturn, NextYrActiveReturn
 )
 from src.market_object import MarketObject, load_data
+from src.user_input import get_factors
 
 
 class TestFactorsBase:
@@ -193,6 +194,18 @@ class TestFactorRetrieval:
             assert value is not None or value is None  # Either way, no exception
 
 
+class TestGetFactorsSelections:
+    """Test non-interactive factor selection"""
+    
+    def test_selections_skip_prompts(self, monkeypatch):
+        """Selections by name build factors without calling input()"""
+        monkeypatch.setattr('builtins.input', lambda *_: pytest.fail("input() called"))
+        factors = get_factors([], selections=['ROE using 9/30 Data', 'Book/Price', 'Unknown'])
+        assert [name for _, name in factors] == ['ROE using 9/30 Data', 'Book/Price']
+        assert isinstance(factors[0][0], ROE)
+        assert isinstance(factors[1][0], BookPrice)
+
+
 class TestFactorEdgeCases:
     """Test edge cases and error handling"""
     
@@ -0,0 +1,70 @@
+"""
+Test suite for main.py command-line options
+Tests that options given on the command line replace the interactive prompts
+"""
+import pytest
+import pandas as pd
+import src.main as main_module
+
+
+@pytest.fixture
+def backtest_calls(monkeypatch):
+    """Replace data loading, the backtest and plotting; record what they were called with"""
+    calls = {}
+
+    def fake_load_data(**kwargs):
+        calls['load'] = kwargs
+        return pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US'],
+            'Date': ['2002-09-30', '2002-09-30'],
+            'Ending Price': [10.0, 20.0],
+            'ROE using 9/30 Data': [0.1, 0.2],
+        })
+
+    def fake_rebalance(rdata, factors, **kwargs):
+        calls['rebalance'] = (factors, kwargs)
+        return {'years': [2002], 'portfolio_values': [1]}
+
+    monkeypatch.setattr(main_module, 'load_data', fake_load_data)
+    monkeypatch.setattr(main_module, 'rebalance_portfolio', fake_rebalance)
+    monkeypatch.setattr(main_module, 'plot_portfolio_growth', lambda **kwargs: None)
+    return calls
+
+
+class TestCommandLine:
+    """Test command-line driven and interactive runs"""
+
+    def test_options_skip_prompts(self, backtest_calls, monkeypatch):
+        """Test that a fully specified command line runs without any prompt"""
+        monkeypatch.setattr('builtins.input', lambda *args: pytest.fail('unexpected prompt'))
+
+        main_module.main([
+            '--factors', 'ROE using 9/30 Data', '--restrict-fossil-fuels', '--supabase',
+            '--no-show-loading', '--sectors', 'Technology', '--verbosity', '2'
+        ])
+
+        assert backtest_calls['load']['restrict_fossil_fuels'] is True
+        assert backtest_calls['load']['use_supabase'] is True
+        assert backtest_calls['load']['sectors'] == ['Technology']
+        factors, kwargs = backtest_calls['rebalance']
+        assert [type(f).__name__ for f in factors] == ['ROE']
+        assert kwargs['verbosity'] == 2
+
+    def test_bare_main_prompts_and_ignores_kernel_argv(self, backtest_calls, monkeypatch):
+        """Test that main() in a notebook kernel ignores sys.argv and asks for every choice"""
+        monkeypatch.setattr(main_module.sys, 'argv', ['ipykernel_launcher.py', '-f', '/tmp/kernel.json'])
+        asked = []
+
+        def prompt(name, value):
+            return lambda *args, **kwargs: asked.append(name) or value
+
+        monkeypatch.setattr(main_module, 'get_fossil_fuel_restriction', prompt('fossil', False))
+        monkeypatch.setattr(main_module, 'get_supabase_preference', prompt('supabase', True))
+        monkeypatch.setattr(main_module, 'get_data_loading_verbosity', prompt('loading', False))
+        monkeypatch.setattr(main_module, 'get_sector_selection', prompt('sectors', ['Technology']))
+        monkeypatch.setattr(main_module, 'get_factors', prompt('factors', []))
+        monkeypatch.setattr(main_module, 'get_verbosity_level', prompt('verbosity', 1))
+
+        main_module.main()
+
+        assert asked == ['fossil', 'supabase', 'loading', 'sectors', 'factors', 'verbosity']
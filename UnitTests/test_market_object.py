@@ -5,7 +5,7 @@ Tests data loading, market object creation, and price retrieval
 import pytest
 import pandas as pd
 import numpy as np
-from src.market_object import MarketObject, load_data, _standardize_column_names
+from src.market_object import MarketObject, load_data, invalidate_load_cache, _standardize_column_names, clean_column_labels, _filter_essential_data
 
 
 class TestDataLoading:
@@ -55,6 +55,106 @@ class TestDataLoading:
         assert len(data_restricted) <= len(data_unrestricted), \
             "Restricted data should have fewer or equal rows than unrestricted"
 
+    def test_load_data_file_is_cached(self, tmp_path):
+        """Test that repeated file loads reuse the cached frame until invalidated"""
+        path = tmp_path / 'market.csv'
+        pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US'],
+            'Ending Price': [150.0, 300.0],
+            'Year': [2022, 2022]
+        }).to_csv(path, index=False)
+        invalidate_load_cache()
+
+        first = load_data(use_supabase=False, data_path=str(path))
+        first.drop(first.index, inplace=True)
+        pd.DataFrame({'Ticker-Region': ['AAPL-US'], 'Ending Price': [1.0], 'Year': [2022]}).to_csv(path, index=False)
+        second = load_data(use_supabase=False, data_path=str(path))
+
+        # Callers get independent copies of the cached frame
+        assert len(second) == 2
+
+        invalidate_load_cache()
+        assert len(load_data(use_supabase=False, data_path=str(path))) == 1
+
+    def test_load_data_writes_parquet_sidecar(self, tmp_path):
+        """Test that a CSV source gets a parquet sidecar that reproduces it"""
+        path = tmp_path / 'market.csv'
+        pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US'],
+            'Ending Price': [150.0, 300.0],
+            'Year': [2022, 2022]
+        }).to_csv(path, index=False)
+        invalidate_load_cache()
+
+        from_csv = load_data(use_supabase=False, data_path=str(path))
+        assert (tmp_path / 'market.parquet').exists()
+
+        invalidate_load_cache()
+        from_sidecar = load_data(use_supabase=False, data_path=str(path))
+        pd.testing.assert_frame_equal(from_csv, from_sidecar)
+
+    def test_load_data_prunes_columns(self, tmp_path):
+        """Test that load_data keeps only the requested (default: market) columns"""
+        path = tmp_path / 'market.csv'
+        pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US'],
+            'Security Name': ['Apple', 'Microsoft'],
+            'Ending Price': [150.0, 300.0],
+            '6-Mo Momentum %': [0.1, 0.2],
+            'Year': [2022, 2022]
+        }).to_csv(path, index=False)
+        invalidate_load_cache()
+
+        pruned = load_data(use_supabase=False, data_path=str(path))
+        full = load_data(use_supabase=False, data_path=str(path), columns=None)
+
+        assert 'Security Name' not in pruned.columns
+        assert '6-Mo Momentum %' in pruned.columns
+        assert 'Security Name' in full.columns
+
+    def test_load_data_drops_duplicate_security_dates(self, tmp_path):
+        """Test that repeated Ticker-Region/Date rows are dropped, keeping the first"""
+        path = tmp_path / 'market.csv'
+        pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'AAPL-US', 'AAPL-US'],
+            'Date': ['2022-09-30', '2022-09-30', '2023-09-30'],
+            'Ending Price': [150.0, 151.0, 170.0],
+        }).to_csv(path, index=False)
+        invalidate_load_cache()
+
+        data = load_data(use_supabase=False, data_path=str(path))
+
+        assert list(data['Ending Price']) == [150.0, 170.0]
+
+    def test_load_data_years(self, tmp_path):
+        """Test that load_data keeps only the requested inclusive year range"""
+        path = tmp_path / 'market.csv'
+        pd.DataFrame({
+            'Ticker-Region': ['AAPL-US'] * 4,
+            'Date': ['2001-09-30', '2002-09-30', '2003-09-30', '2004-09-30'],
+            'Ending Price': [100.0, 110.0, 120.0, 130.0],
+        }).to_csv(path, index=False)
+        invalidate_load_cache()
+
+        data = load_data(use_supabase=False, data_path=str(path), years=(2002, 2003))
+
+        assert list(data['Year']) == [2002, 2003]
+
+
+    def test_excel_prefers_calamine(self, monkeypatch, tmp_path):
+        """Test that Excel sources use the calamine engine when it is installed"""
+        import sys
+        import types
+        import src.market_object as market_object
+        seen = []
+        monkeypatch.setattr(pd, 'read_excel', lambda *args, **kwargs: seen.append(kwargs['engine']) or pd.DataFrame())
+
+        monkeypatch.setitem(sys.modules, 'python_calamine', None)
+        market_object._read_excel(tmp_path / 'market.xlsx')
+        monkeypatch.setitem(sys.modules, 'python_calamine', types.ModuleType('python_calamine'))
+        market_object._read_excel(tmp_path / 'market.xlsx')
+
+        assert seen == [None, 'calamine']
 
 class TestColumnStandardization:
     """Test column name standardization"""
@@ -80,6 +180,42 @@ class TestColumnStandardization:
         assert '1-Yr Price Vol %' in standardized.columns
         assert 'Next FY Earns/P' in standardized.columns
 
+    def test_standardize_column_names_categorical_labels(self):
+        """Test that ticker and industry labels are stored as categoricals"""
+        test_data = pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US', 'AAPL-US'],
+            'FactSet_Industry': ['Telecommunications Equipment', 'Packaged Software', 'Telecommunications Equipment'],
+            'Ending_Price': [150.0, 300.0, 160.0]
+        })
+
+        standardized = _standardize_column_names(test_data)
+
+        assert isinstance(standardized['Ticker'].dtype, pd.CategoricalDtype)
+        assert isinstance(standardized['FactSet Industry'].dtype, pd.CategoricalDtype)
+        assert list(standardized['Ticker']) == ['AAPL', 'MSFT', 'AAPL']
+
+    def test_filter_essential_data(self):
+        """Test that rows with a missing, non-positive or infinite price, or no ticker, are dropped"""
+        data = pd.DataFrame({
+            'Ticker': ['A', 'B', 'C', 'D', 'E', '--'],
+            'Year': [2002] * 6,
+            'Ending Price': [10.0, np.nan, 0.0, np.inf, '12.5', 3.0],
+        })
+        kept = _filter_essential_data(data)
+        assert list(kept['Ticker']) == ['A', 'E']
+        assert list(kept['Ending Price']) == [10.0, 12.5]
+
+    def test_clean_column_labels(self):
+        """Test that labels are stripped and deduplicated, and clean frames pass through untouched"""
+        messy = pd.DataFrame([[1, 2, 3]], columns=[' Ticker', 'Year ', 'Ticker'])
+        cleaned = clean_column_labels(messy)
+        assert list(cleaned.columns) == ['Ticker', 'Year']
+        assert list(messy.columns) == [' Ticker', 'Year ', 'Ticker']
+
+        tidy = pd.DataFrame({'Ticker': ['AAPL'], 'Year': [2002]})
+        assert clean_column_labels(tidy) is tidy
+        assert clean_column_labels(tidy) is tidy
+
 
 class TestMarketObject:
     """Test MarketObject class functionality"""
@@ -124,7 +260,30 @@ class TestMarketObject:
         """Test price retrieval for non-existent ticker"""
         price = market.get_price('INVALID')
         assert price is None
+
+    def test_get_prices_matches_get_price(self, market):
+        """Test vectorized price retrieval aligns with get_price"""
+        prices = market.get_prices(['MSFT', 'INVALID', 'AAPL'])
+
+        assert prices[0] == 300.0
+        assert np.isnan(prices[1])
+        assert prices[2] == 150.0
     
+    def test_market_leaves_input_untouched(self):
+        """Test that deriving Ticker/Year and cleaning values don't modify the caller's frame"""
+        data = pd.DataFrame({
+            'Ticker-Region': ['AAPL-US', 'MSFT-US'],
+            'Date': ['2022-09-30', '2022-09-30'],
+            'Ending Price': ['150.0', '--'],
+        })
+        before = data.copy()
+
+        market = MarketObject(data, 2022)
+
+        pd.testing.assert_frame_equal(data, before)
+        assert market.get_price('AAPL') == 150.0
+        assert list(market.stocks['Year']) == [2022, 2022]
+
     def test_market_with_missing_values(self):
         """Test MarketObject handles missing values correctly"""
         data = pd.DataFrame({
@@ -140,7 +299,25 @@ class TestMarketObject:
         # Should handle NaN prices gracefully
         price = market.get_price('MSFT')
         assert price is None or pd.isna(price)
+    
+    def test_get_reads_column_arrays(self, market):
+        """Test that get() matches .loc lookups and returns None for missing keys"""
+        for ticker in market.stocks.index:
+            assert market.get(ticker, 'Ending Price') == market.stocks.loc[ticker, 'Ending Price']
+        assert market.get('ZZZZ', 'Ending Price') is None
+        assert market.get('AAPL', 'No Such Column') is None
 
+    
+    def test_as_arrays_bundle(self, market):
+        """Test that the array bundle lines up with the frame"""
+        arrays = market.as_arrays()
+        assert arrays.factor_names == ('ROE using 9/30 Data',)
+        assert arrays.factor_matrix.flags['C_CONTIGUOUS']
+        assert arrays.factor_matrix.shape == (3, 1)
+        row = arrays.index_map['MSFT']
+        assert arrays.prices[row] == 300.0
+        assert arrays.factor_matrix[row, 0] == 0.30
+        assert market.as_arrays() is arrays
 
 class TestMarketObjectIntegration:
     """Integration tests using real data"""
@@ -179,3 +356,4 @@ class TestMarketObjectIntegration:
                 market = MarketObject(year_data, int(year))
                 assert market.t == int(year)
                 assert len(market.stocks) > 0
+
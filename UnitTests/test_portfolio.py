@@ -162,6 +162,37 @@ class TestPortfolioValuation:
         # 10.5 shares * $150 = $1,575
         assert value == 1575.0
 
+    def test_present_value_with_get_price_only_market(self, portfolio):
+        """Test present value against a market object that only provides get_price"""
+        class PriceOnlyMarket:
+            def get_price(self, ticker):
+                return {'AAPL': 150.0}.get(ticker)
+
+        # AAPL: 10 shares * $150; MSFT has no price and is skipped
+        assert portfolio.present_value(PriceOnlyMarket()) == 1500.0
+
+    def test_finalize_keeps_holdings(self, portfolio, market):
+        """Test finalized portfolio exposes arrays and still accepts investments"""
+        tickers, shares = portfolio.finalize().as_arrays()
+
+        assert list(tickers) == ['AAPL', 'MSFT']
+        assert list(shares) == [10.0, 5.0]
+
+        portfolio.add_investment('GOOGL', 1)
+
+        assert len(portfolio.investments) == 3
+        assert portfolio.present_value(market) == 5800.0
+
+    def test_arrays_follow_list_edits(self, portfolio, market):
+        """Test that cached arrays are rebuilt after removals and after finalize() on in-place edits"""
+        portfolio.as_arrays()
+        portfolio.remove_investment('AAPL')
+        assert list(portfolio.as_arrays()[0]) == ['MSFT']
+
+        portfolio.investments[0]['number_of_shares'] = 10
+        portfolio.finalize()
+        assert portfolio.present_value(market) == 3000.0
+
 
 class TestPortfolioReturns:
     """Test return calculations"""
@@ -1,5 +1,5 @@
 import pandas as pd
-from src.market_object import _apply_sector_filter
+from src.market_object import _apply_sector_filter, _apply_fossil_filter
 
 def test_apply_sector_filter_basic():
     df = pd.DataFrame({
@@ -19,3 +19,25 @@ def test_apply_sector_filter_missing_col():
     # Should return unchanged if sector column missing
     out = _apply_sector_filter(df, ["Consumer"], context_label="Test")
     assert len(out) == 1
+
+
+def test_apply_fossil_filter_basic():
+    df = pd.DataFrame({
+        "Ticker": ["A", "B", "C", "D"],
+        "FactSet Industry": ["Integrated Oil", "Packaged Software", None, "Coal"],
+        "Ending Price": [10, 20, 30, 40],
+    })
+    out = _apply_fossil_filter(df, context_label="Test")
+    assert list(out["Ticker"]) == ["B", "C"]
+    # Industry labels are left as loaded
+    assert out["FactSet Industry"].iloc[0] == "Packaged Software"
+
+
+def test_apply_fossil_filter_categorical_industry():
+    df = pd.DataFrame({
+        "Ticker": ["A", "B", "C", "D", "E"],
+        "FactSet Industry": pd.Categorical(["Integrated Oil", "Packaged Software", None, "Coal", "Gas Utilities"]),
+        "Ending Price": [10, 20, 30, 40, 50],
+    })
+    out = _apply_fossil_filter(df, context_label="Test")
+    assert list(out["Ticker"]) == ["B", "C"]
@@ -0,0 +1,210 @@
+"""
+Test suite for the Supabase loader's paging, using an in-memory stand-in for the client
+(no credentials or network needed)
+"""
+import pytest
+import pandas as pd
+from postgrest import base_request_builder
+import src.supabase_client as supabase_client
+from src.supabase_client import load_supabase_data, iter_supabase_data
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, rows, requests, filters):
+        self.rows = rows
+        self.requests = requests
+        self.filters = filters
+        self.start = 0
+        self.stop = None
+        self.count = None
+
+    def select(self, clause, count=None):
+        self.count = count
+        return self
+
+    @property
+    def not_(self):
+        return self
+
+    def is_(self, col, value):
+        self.filters.append((col, 'not.is', value))
+        return self
+
+    def gt(self, col, value):
+        self.filters.append((col, 'gt', value))
+        return self
+
+    def gte(self, col, value):
+        self.filters.append((col, 'gte', value))
+        return self
+
+    def lte(self, col, value):
+        self.filters.append((col, 'lte', value))
+        return self
+
+    def lt(self, col, value):
+        self.filters.append((col, 'lt', value))
+        return self
+
+    def limit(self, n):
+        self.stop = n
+        return self
+
+    def range(self, start, end):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def execute(self):
+        self.requests.append(self.start)
+        return FakeResponse(self.rows[self.start:self.stop], len(self.rows) if self.count else None)
+
+
+class FakeClient:
+    supabase_url = 'http://fake'
+
+    def __init__(self, n_rows):
+        self.rows = [{'Ticker-Region': f'T{i}-US', 'Date': '2002-09-30', 'Ending_Price': float(i)}
+                     for i in range(n_rows)]
+        self.requests = []
+        self.filters = []
+
+    def table(self, name):
+        return FakeQuery(self.rows, self.requests, self.filters)
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    monkeypatch.setenv('SUPABASE_URL', 'http://fake')
+    monkeypatch.setenv('SUPABASE_KEY', 'key')
+    monkeypatch.delenv('SUPABASE_CACHE_DIR', raising=False)
+    monkeypatch.setattr(supabase_client, '_TABLE_COLUMNS', {})
+    monkeypatch.setattr(supabase_client, '_CLIENTS', {})
+    # load_supabase_data swaps postgrest's JSON adapter; put the original back afterwards
+    monkeypatch.setattr(base_request_builder, 'JSONAdapter', base_request_builder.JSONAdapter)
+
+    def install(n_rows):
+        client = FakeClient(n_rows)
+        monkeypatch.setattr('supabase.create_client', lambda url, key: client)
+        return client
+    return install
+
+
+class TestPaging:
+    """Test that concurrent page fetches reassemble every row in order"""
+
+    @pytest.mark.parametrize('n_rows', [0, 999, 1000, 5500, 8000])
+    def test_all_rows_in_order(self, fake_supabase, n_rows):
+        client = fake_supabase(n_rows)
+        data = load_supabase_data(show_progress=False)
+        assert len(data) == n_rows
+        if n_rows:
+            assert list(data['Ending_Price']) == [float(i) for i in range(n_rows)]
+        assert 0 in client.requests
+
+    def test_row_estimate_stops_requests_past_the_end(self, fake_supabase):
+        client = fake_supabase(2500)
+        load_supabase_data(show_progress=False)
+        assert sorted(client.requests) == [0, 1000, 2000]
+
+    def test_low_row_estimate_still_reads_everything(self, fake_supabase, monkeypatch):
+        client = fake_supabase(5500)
+        monkeypatch.setattr(FakeResponse, 'count', property(lambda self: 1200, lambda self, value: None), raising=False)
+        data = load_supabase_data(show_progress=False)
+        assert len(data) == 5500
+
+    def test_on_page_called_in_order(self, fake_supabase):
+        fake_supabase(2500)
+        seen = []
+        load_supabase_data(show_progress=False, on_page=lambda n, total, page: seen.append((n, total)))
+        assert seen == [(1000, 2500), (2000, 2500), (2500, 2500)]
+
+    def test_client_reused_across_loads(self, fake_supabase, monkeypatch):
+        created = []
+        client = fake_supabase(10)
+        monkeypatch.setattr('supabase.create_client', lambda url, key: created.append(url) or client)
+        load_supabase_data(show_progress=False)
+        load_supabase_data(show_progress=False)
+        assert created == ['http://fake']
+
+    def test_iter_yields_pages(self, fake_supabase):
+        fake_supabase(2500)
+        pages = list(iter_supabase_data(sectors=['Tech']))
+        assert [len(page) for page in pages] == [1000, 1000, 500]
+        assert pd.concat(pages)['Ending_Price'].tolist() == [float(i) for i in range(2500)]
+
+    def test_pages_with_differing_types_concat(self):
+        pages = [supabase_client._page_frame(batch) for batch in (
+            [{'Ticker-Region': 'A-US', 'ROA': None}],
+            [{'Ticker-Region': 'B-US', 'ROA': 2}],
+            [{'Ticker-Region': 'C-US', 'ROA': 1.5}, {'Ticker-Region': 'D-US', 'ROA': '--'}],
+        )]
+        data = supabase_client._concat_pages(pages)
+        assert list(data['Ticker-Region']) == ['A-US', 'B-US', 'C-US', 'D-US']
+        assert list(data['ROA'][1:]) == [2, 1.5, '--']
+
+
+class TestServerFilters:
+    """Test that validity filters are sent to the server for columns the table has"""
+
+    def test_required_and_positive_filters(self, fake_supabase):
+        client = fake_supabase(10)
+        load_supabase_data(show_progress=False, required=['Date', 'Missing'], positive=['Ending_Price'])
+        assert set(client.filters) == {('Date', 'not.is', 'null'), ('Ending_Price', 'gt', 0)}
+
+    def test_years_filter_on_dates(self, fake_supabase):
+        client = fake_supabase(10)
+        data = load_supabase_data(show_progress=False, years=(2002, 2004))
+        assert set(client.filters) == {('Date', 'gte', '2002-01-01'), ('Date', 'lt', '2005-01-01')}
+        assert 'years' in data.attrs['server_filters']
+
+    def test_years_filter_on_year_column(self, fake_supabase):
+        client = fake_supabase(10)
+        for row in client.rows:
+            row['Year'] = 2002
+        load_supabase_data(show_progress=False, years=(2002, 2004))
+        assert set(client.filters) == {('Year', 'gte', 2002), ('Year', 'lte', 2004)}
+
+
+class TestFastJSON:
+    """Test that the faster PostgREST JSON decoding matches the library's own"""
+
+    def test_decodes_like_postgrest(self, monkeypatch):
+        original = base_request_builder.JSONAdapter
+        monkeypatch.setattr(base_request_builder, 'JSONAdapter', original)
+        supabase_client._use_fast_json()
+        supabase_client._use_fast_json()
+        fast = base_request_builder.JSONAdapter
+        assert isinstance(fast, supabase_client._FastJSONAdapter)
+        assert fast._adapter is original
+
+        content = b'[{"Ticker-Region": "A-US", "ROA": 1.5, "Date": null}]'
+        assert fast.validate_json(content) == original.validate_json(content)
+        with pytest.raises(ValueError):
+            fast.validate_json(b'not json')
+
+
+class TestPullCache:
+    """Test the optional on-disk copy of Supabase pulls"""
+
+    def test_second_pull_served_from_cache(self, fake_supabase, tmp_path):
+        pytest.importorskip('pyarrow')
+        client = fake_supabase(1500)
+        first = load_supabase_data(show_progress=False, cache_dir=tmp_path)
+        client.requests.clear()
+        second = load_supabase_data(show_progress=False, cache_dir=tmp_path)
+        assert client.requests == []
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_filters_get_their_own_entry(self, fake_supabase, tmp_path):
+        pytest.importorskip('pyarrow')
+        client = fake_supabase(10)
+        load_supabase_data(show_progress=False, cache_dir=tmp_path)
+        client.requests.clear()
+        load_supabase_data(show_progress=False, cache_dir=tmp_path, sectors=['Tech'])
+        assert client.requests
@@ -9,7 +9,7 @@ Run with: pytest -m integration (when credentials are available)
 import pytest
 import pandas as pd
 import os
-from src.supabase_client import load_supabase_data
+from src.supabase_client import load_supabase_data, _connect, _table_columns
 
 # Skip entire module if no credentials
 pytestmark = [
@@ -22,12 +22,26 @@ pytestmark = [
 ]
 
 
+@pytest.fixture(scope='module')
+def supabase_data():
+    """Default table, fetched once for every test that only reads it"""
+    return load_supabase_data()
+
+
+@pytest.fixture(scope='module')
+def supabase_columns():
+    """Column names of the default table, from a one-row probe (no full download)"""
+    columns = _table_columns(_connect(), 'Full Precision Test')
+    assert columns is not None, "Column probe failed: query error or empty table 'Full Precision Test'"
+    return columns
+
+
 class TestSupabaseConnection:
     """Test Supabase connection and basic queries"""
     
-    def test_load_supabase_data_basic(self):
+    def test_load_supabase_data_basic(self, supabase_data):
         """Test basic data loading from Supabase"""
-        data = load_supabase_data()
+        data = supabase_data
         
         assert isinstance(data, pd.DataFrame)
         assert not data.empty, "Data should not be empty"
@@ -40,32 +54,32 @@ class TestSupabaseConnection:
         assert isinstance(data, pd.DataFrame)
         assert not data.empty
     
-    def test_loaded_data_structure(self):
-        """Test that loaded data has expected structure"""
-        data = load_supabase_data()
+    def test_loaded_data_structure(self, supabase_columns):
+        """Test that the table has the expected structure"""
+        columns = supabase_columns
         
         # Should have multiple columns
-        assert len(data.columns) > 10, "Should have multiple columns"
+        assert len(columns) > 10, "Should have multiple columns"
         
         # Should have expected key columns
         expected_columns = ['ID', 'Security_Name', 'Ticker-Region', 'Ending_Price']
         for col in expected_columns:
-            assert col in data.columns, f"Missing column: {col}"
+            assert col in columns, f"Missing column: {col}"
 
 
 class TestSupabasePagination:
     """Test pagination functionality"""
     
-    def test_pagination_loads_all_records(self):
+    def test_pagination_loads_all_records(self, supabase_data):
         """Test that pagination loads all available records"""
-        data = load_supabase_data()
+        data = supabase_data
         
         # Should load thousands of records (known dataset size)
         assert len(data) > 10000, "Should load large dataset with pagination"
     
-    def test_pagination_no_duplicates(self):
+    def test_pagination_no_duplicates(self, supabase_data):
         """Test that pagination doesn't create duplicate records"""
-        data = load_supabase_data()
+        data = supabase_data
         
         # Check if there are duplicate rows
         duplicates = data.duplicated()
@@ -76,15 +90,15 @@ class TestSupabaseDataQuality:
     """Test quality of loaded data"""
     
     @pytest.fixture
-    def data(self):
+    def data(self, supabase_data):
         """Load data for testing"""
-        return load_supabase_data()
+        return supabase_data
     
     def test_data_has_records(self, data):
         """Test that data has substantial number of records"""
         assert len(data) > 1000, "Should have significant amount of data"
     
-    def test_required_columns_present(self, data):
+    def test_required_columns_present(self, supabase_columns):
         """Test that all required columns are present"""
         required = [
             'ID', 'Security_Name', 'Ticker-Region', 'Ending_Price',
@@ -92,7 +106,7 @@ class TestSupabaseDataQuality:
         ]
         
         for col in required:
-            assert col in data.columns, f"Required column missing: {col}"
+            assert col in supabase_columns, f"Required column missing: {col}"
     
     def test_data_types_appropriate(self, data):
         """Test that data types are appropriate"""
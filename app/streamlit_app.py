@@ -4,17 +4,29 @@ Interactive web interface for running factor-based portfolio backtests
 """
 import sys
 import os
+import hashlib
+import time
 
-# Load environment variables from .env file
 from pathlib import Path
-env_path = Path(__file__).parent / '.env'
-if env_path.exists():
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key] = value
+import streamlit as st
+
+# Load environment variables from .env file. Streamlit re-executes this script on every
+# interaction; os.environ persists across reruns, so parse the file once per process.
+@st.cache_resource(show_spinner=False)
+def _load_env():
+    env_path = Path(__file__).parent / '.env'
+    if not env_path.exists():
+        return {}
+    env = {}
+    for line in env_path.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith('#') and '=' in line:
+            key, value = line.split('=', 1)
+            env[key] = value
+    os.environ.update(env)
+    return env
+
+_load_env()
 
 # Add src directory to path by searching parent directories until a `src` folder
 # is found. This makes the app runnable from different working directories
@@ -24,17 +36,19 @@ def _ensure_src_on_path():
     for _ in range(6):
         candidate = p / 'src'
         if candidate.is_dir():
-            sys.path.insert(0, str(p))
+            # Reruns execute this again; don't keep growing sys.path
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
             return
         p = p.parent
     # Fallback: use the original one-level-up heuristic
-    sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    fallback = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+    if fallback not in sys.path:
+        sys.path.insert(0, fallback)
 
 _ensure_src_on_path()
 
-import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 
@@ -74,16 +88,14 @@ def check_password():
         return True
 
 # Import project modules
-from src.market_object import load_data
+from src.market_object import load_data, ticker_from_region, year_from_dates
 from src.calculate_holdings import rebalance_portfolio
 from src.factor_function import (
     Momentum6m, Momentum12m, Momentum1m, ROE, ROA, 
     P2B, NextFYrEarns, OneYrPriceVol,
     AccrualsAssets, ROAPercentage, OneYrAssetGrowth, OneYrCapEXGrowth, BookPrice
 )
-# Import from Visualizations (not in src)
-from Visualizations.portfolio_growth_plot import plot_portfolio_growth
-from Visualizations.top_bottom_portfolio_plot import plot_top_bottom_percent
+# matplotlib and the Visualizations plots are imported where the Results tab draws them
 
 # Page configuration
 st.set_page_config(
@@ -92,121 +104,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS - Extensive styling options
-st.markdown("""
-<style>
-    /* Main header styling */
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    /* Alert boxes */
-    .stAlert {
-        margin-top: 1rem;
-        border-radius: 10px;
-    }
-    
-    /* Buttons */
-    .stButton>button {
-        border-radius: 8px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }
-    
-    /* Sidebar (configuration panel) - grey accent */
-    [data-testid="stSidebar"] {
-        background-color: #DEDFE0; /* grey */
-        border-left: 4px solid #3BD2E3; /* lake accent */
-        padding-left: 8px;
-    }
-    
-    [data-testid="stSidebar"] h2 {
-        color: #1f77b4;
-    }
-    
-    /* Metrics */
-    [data-testid="stMetricValue"] {
-        font-size: 2rem;
-        font-weight: bold;
-    }
-    
-    /* Dataframes */
-    .dataframe {
-        border-radius: 8px;
-    }
-    
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    
-                if st.session_state["password"] == configured_password:
-        border-radius: 8px 8px 0 0;
-        padding: 10px 20px;
-        font-weight: 600;
-    }
-    
-            if configured_password is None:
-                st.info("Admin password is not configured. Set 'password' in Streamlit Secrets (or ADMIN_PASSWORD env) to enable access.")
-                return False
-    .stCheckbox {
-        padding: 5px 0;
-    }
-                    "Enter Password", type="password", on_change=password_entered, key="password"
-    /* Expander */
-    .streamlit-expanderHeader {
-        border-radius: 8px;
-        font-weight: 600;
-    }
-    
-                    "Enter Password", type="password", on_change=password_entered, key="password"
-    .element-container .stSuccess {
-                st.error("Password incorrect")
-        border-left: 4px solid #28a745;
-    }
-    
-    .element-container .stError {
-        background-color: #f8d7da;
-        border-left: 4px solid #dc3545;
-    }
-    
-    /* Custom card styling */
-    .custom-card {
-        padding: 20px;
-        border-radius: 10px;
-        background-color: #ffffff;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        margin: 10px 0;
-    }
-    
-    /* Hide Streamlit branding (optional) */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Responsive design adjustments */
-    @media (max-width: 768px) {
-        .main-header {
-            font-size: 1.8rem;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS - Extensive styling options (kept in assets/app.css)
+@st.cache_resource
+def _app_css():
+    """Stylesheet text, read from disk once per server process."""
+    css = (Path(__file__).parent / 'assets' / 'app.css').read_text()
+    # Collapse whitespace so each rerun ships the smallest payload
+    return '<style>' + ' '.join(css.split()) + '</style>'
+
+# Re-emitted on every rerun (Streamlit drops elements a run does not draw), but never rebuilt
+st.markdown(_app_css(), unsafe_allow_html=True)
 
 # Initialize session state
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
-if 'rdata' not in st.session_state:
-    st.session_state.rdata = None
+if 'rdata_key' not in st.session_state:
+    st.session_state.rdata_key = None
 if 'results' not in st.session_state:
     st.session_state.results = None
 
@@ -227,6 +140,14 @@ FACTOR_MAP = {
     'Book/Price': BookPrice
 }
 
+# st.cache_resource rather than functools.lru_cache: Streamlit re-executes this script on
+# every rerun, which would give a module-level lru_cache a fresh (empty) cache each time
+@st.cache_resource(show_spinner=False)
+def _make_factor(name):
+    """Shared factor instance per name. Factor objects only hold their column name, so
+    reusing one across runs and sessions is safe; keep them stateless."""
+    return FACTOR_MAP[name]()
+
 # Sector options
 SECTOR_OPTIONS = [
     'Consumer',
@@ -236,6 +157,391 @@ SECTOR_OPTIONS = [
     'Healthcare'
 ]
 
+# Preprocessed data is also kept on disk so a server restart doesn't mean re-querying Supabase.
+# Files are keyed by the load parameters, expire after a day and only the most recent few are kept.
+RDATA_CACHE_DIR = Path(__file__).parent / 'cache'
+RDATA_CACHE_MAX_AGE = 24 * 3600
+RDATA_CACHE_MAX_FILES = 8
+LOAD_COLUMNS = ('Ticker', 'Year', 'Ending Price', 'Market Capitalization') + tuple(FACTOR_MAP)
+
+
+def _rdata_cache_path(restrict_fossil_fuels, sectors):
+    key = hashlib.blake2b(repr((restrict_fossil_fuels, sectors, LOAD_COLUMNS)).encode(), digest_size=16).hexdigest()
+    return RDATA_CACHE_DIR / f'rdata_{key}.parquet'
+
+
+def _read_rdata_cache(path):
+    """Return the cached frame at `path` if it is fresh, else None."""
+    try:
+        if time.time() - path.stat().st_mtime < RDATA_CACHE_MAX_AGE:
+            rdata = pd.read_parquet(path)
+            os.utime(path)  # Touch so eviction keeps recently used files
+            return rdata
+    except Exception:
+        pass
+    return None
+
+
+def _write_rdata_cache(path, rdata):
+    """Best-effort write of `rdata` to `path`, evicting the oldest files beyond the limit."""
+    try:
+        path.parent.mkdir(exist_ok=True)
+        rdata.to_parquet(path, compression='zstd')
+        files = sorted(path.parent.glob('rdata_*.parquet'), key=lambda f: f.stat().st_mtime, reverse=True)
+        for stale in files[RDATA_CACHE_MAX_FILES:]:
+            stale.unlink()
+    except Exception:
+        # Non-fatal: no parquet support (pyarrow) or a read-only deployment just skips the disk cache
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_and_prep(restrict_fossil_fuels, sectors, _show_loading=False):
+    """Load and preprocess market data once per (fossil filter, sectors) choice.
+
+    `sectors` must be hashable (a sorted tuple or None). Arguments with a leading
+    underscore are not part of the cache key.
+    """
+    cache_path = _rdata_cache_path(restrict_fossil_fuels, sectors)
+    cached = _read_rdata_cache(cache_path)
+    if cached is not None:
+        return cached
+
+    # Show progress and the first rows while pages are still arriving; both are
+    # cleared once loading finishes (the elements must live inside the cached call)
+    progress = st.progress(0.0, text="Fetching market data...")
+    first_rows = st.empty()
+
+    def on_page(rows_loaded, total_estimate, page):
+        if total_estimate:
+            progress.progress(min(rows_loaded / total_estimate, 1.0),
+                              text=f"Fetched {rows_loaded:,} of ~{total_estimate:,} rows")
+        else:
+            progress.progress(0.0, text=f"Fetched {rows_loaded:,} rows")
+        if rows_loaded == len(page):
+            first_rows.dataframe(page.head(100), use_container_width=True)
+
+    rdata = load_data(
+        restrict_fossil_fuels=restrict_fossil_fuels,
+        use_supabase=True,
+        data_path=None,
+        show_loading_progress=_show_loading,
+        sectors=list(sectors) if sectors else None,
+        on_page=on_page,
+        # Fetch only what the backtest uses (the loader adds its own key/filter columns)
+        columns=LOAD_COLUMNS
+    )
+
+    # Data preprocessing
+    # load_data already derives Ticker as a categorical; keep it that way (integer-coded groupby/sort)
+    if 'Ticker' not in rdata.columns:
+        rdata['Ticker'] = ticker_from_region(rdata['Ticker-Region'])
+    if not isinstance(rdata['Ticker'].dtype, pd.CategoricalDtype):
+        rdata['Ticker'] = rdata['Ticker'].astype('category')
+    # load_data already derives Year from Date; only fill it in if it is missing
+    if 'Year' not in rdata.columns:
+        rdata['Year'] = year_from_dates(rdata['Date'])
+
+    # Keep only relevant columns (include Market Capitalization for cap-weighted portfolios)
+    cols_to_keep = ['Ticker', 'Year']
+    if 'Ending Price' in rdata.columns:
+        cols_to_keep.append('Ending Price')
+    elif 'Ending_Price' in rdata.columns:
+        rdata['Ending Price'] = rdata['Ending_Price']
+        cols_to_keep.append('Ending Price')
+
+    # Add Market Capitalization if available (needed for cap-weighted portfolios)
+    if 'Market Capitalization' in rdata.columns:
+        cols_to_keep.append('Market Capitalization')
+    elif 'Market_Capitalization' in rdata.columns:
+        rdata['Market Capitalization'] = rdata['Market_Capitalization']
+        cols_to_keep.append('Market Capitalization')
+
+    for factor in FACTOR_MAP.keys():
+        if factor in rdata.columns:
+            cols_to_keep.append(factor)
+
+    progress.empty()
+    first_rows.empty()
+
+    # Column selection is lazy under copy-on-write; only the loader's helper columns are dropped here
+    rdata = rdata[cols_to_keep]
+
+    # Factor scores only feed rankings, so float32 is plenty and halves their footprint in the
+    # cache and session state. Prices and market caps stay float64 for portfolio valuation.
+    factor_cols = [col for col in FACTOR_MAP if col in rdata.columns]
+    if factor_cols:
+        rdata = rdata.assign(**{
+            col: pd.to_numeric(rdata[col], errors='coerce').astype('float32') for col in factor_cols
+        })
+    _write_rdata_cache(cache_path, rdata)
+    return rdata
+
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _period_data(restrict_fossil_fuels, sectors, start_year, end_year):
+    """Loaded data limited to the analysis period, and its content signature.
+
+    A shared resource, so every session with the same load settings reads one in-process
+    frame (st.cache_data would hand each caller its own copy). Years of None keep everything.
+    """
+    rdata = _load_and_prep(restrict_fossil_fuels, sectors)
+    if start_year is not None:
+        rdata = rdata[(rdata['Year'] >= start_year) & (rdata['Year'] <= end_year)]
+    return rdata, int(pd.util.hash_pandas_object(rdata).sum())
+
+
+def get_rdata():
+    """(rdata, signature) for this session's loaded data; session state only holds its key."""
+    return _period_data(*st.session_state.rdata_key)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _run_rebalance(rdata_signature, factor_names, start_year, end_year, initial_aum,
+                   restrict_fossil_fuels, top_pct=10, which='top', use_market_cap_weight=False,
+                   _rdata=None, _verbosity=0):
+    """Cached rebalance_portfolio keyed on a content hash of the data plus the run settings."""
+    return rebalance_portfolio(
+        _rdata,
+        [_make_factor(name) for name in factor_names],
+        start_year=start_year,
+        end_year=end_year,
+        initial_aum=initial_aum,
+        verbosity=_verbosity,
+        restrict_fossil_fuels=restrict_fossil_fuels,
+        top_pct=top_pct,
+        which=which,
+        use_market_cap_weight=use_market_cap_weight
+    )
+
+
+# Partial reruns when available (st.fragment, Streamlit >= 1.37; experimental_fragment
+# since 1.33); on older versions this is a no-op and the whole script reruns as before
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda fn: fn)
+
+
+@_fragment
+def _cohort_analysis(results, verbosity_level):
+    """Top/bottom cohort section; its slider, checkbox and button rerun only this block."""
+    # Top/Bottom Cohort Analysis
+    st.subheader("Top vs Bottom Cohort Analysis")
+
+    with st.expander("View Top/Bottom Portfolio Performance", expanded=False):
+        st.markdown("""
+        This visualization compares the performance of the **top N%** and **bottom N%** 
+        of stocks selected by your factors against the benchmark and the main portfolio.
+        """)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            cohort_pct = st.slider(
+                "Select Cohort Percentage",
+                min_value=1,
+                max_value=100,
+                value=10,
+                step=1,
+                help="Percentage of stocks to include in top/bottom cohorts (1-100%)"
+            )
+        with col2:
+            show_bottom_cohort = st.checkbox("Show Bottom Cohort", value=True, help="Display the bottom-performing cohort")
+
+        if st.button("Generate Top/Bottom Analysis", key="top_bottom_btn"):
+            with st.spinner("Generating cohort analysis..."):
+                try:
+                    from Visualizations.top_bottom_portfolio_plot import plot_top_bottom_percent
+
+                    rdata, rdata_signature = get_rdata()
+
+                    # Get factor objects (instantiate classes)
+                    factor_objects = [_make_factor(name) for name in st.session_state.selected_factors]
+
+                    # Get years from results (ensure user re-runs analysis after changing the period)
+                    analysis_years = results['years']
+
+                    # First pass: get diagnostics to understand selection and dropped tickers
+                    details = plot_top_bottom_percent(
+                        rdata=rdata,
+                        factors=factor_objects,
+                        years=analysis_years,
+                        percent=cohort_pct,
+                        show_bottom=show_bottom_cohort,
+                        restrict_fossil_fuels=st.session_state.restrict_ff,
+                        benchmark_returns=results.get('benchmark_returns'),
+                        benchmark_label='Russell 2000',
+                        initial_investment=st.session_state.initial_aum,
+                        verbose=False,
+                        baseline_portfolio_values=results['portfolio_values'],
+                        use_rebalance_for_selection=True,
+                        return_details=True
+                    )
+
+                    # Instead of showing raw diagnostics JSON, present concise metrics:
+                    # final AUM and percent gain for Top and Bottom cohorts (final year).
+                    top_start = top_end = bot_start = bot_end = None
+                    # Extract numbers from details if present
+                    if isinstance(details, dict) and 'per_year' in details and details['per_year']:
+                        last = details['per_year'][-1]
+                        top = last.get('top', {})
+                        bot = last.get('bottom', {})
+                        top_start = top.get('start')
+                        top_end = top.get('end')
+                        bot_start = bot.get('start') if bot else None
+                        bot_end = bot.get('end') if bot else None
+                    else:
+                        # Fallback: call rebalance_portfolio directly to compute top/bottom series
+                        try:
+                            res_top = _run_rebalance(
+                                rdata_signature,
+                                tuple(st.session_state.selected_factors),
+                                start_year=analysis_years[0],
+                                end_year=analysis_years[-1],
+                                initial_aum=st.session_state.initial_aum,
+                                restrict_fossil_fuels=st.session_state.restrict_ff,
+                                top_pct=cohort_pct,
+                                which='top',
+                                _rdata=rdata
+                            )
+                            res_bot = _run_rebalance(
+                                rdata_signature,
+                                tuple(st.session_state.selected_factors),
+                                start_year=analysis_years[0],
+                                end_year=analysis_years[-1],
+                                initial_aum=st.session_state.initial_aum,
+                                restrict_fossil_fuels=st.session_state.restrict_ff,
+                                top_pct=cohort_pct,
+                                which='bottom',
+                                _rdata=rdata
+                            ) if show_bottom_cohort else None
+                            if isinstance(res_top, dict) and 'portfolio_values' in res_top:
+                                tv = list(res_top.get('portfolio_values', []))
+                                if len(tv) >= 2:
+                                    top_start = tv[-2]
+                                    top_end = tv[-1]
+                                elif len(tv) == 1:
+                                    top_start = top_end = tv[0]
+                            if res_bot and isinstance(res_bot, dict) and 'portfolio_values' in res_bot:
+                                bv = list(res_bot.get('portfolio_values', []))
+                                if len(bv) >= 2:
+                                    bot_start = bv[-2]
+                                    bot_end = bv[-1]
+                                elif len(bv) == 1:
+                                    bot_start = bot_end = bv[0]
+                        except Exception:
+                            pass
+
+                    # Display overall growth metrics (start -> finish) for Top/Bottom using rebalance results
+                    try:
+                        # Compute top/bottom rebalance series to get full portfolio values
+                        res_top = _run_rebalance(
+                            rdata_signature,
+                            tuple(st.session_state.selected_factors),
+                            start_year=analysis_years[0],
+                            end_year=analysis_years[-1],
+                            initial_aum=st.session_state.initial_aum,
+                            restrict_fossil_fuels=st.session_state.restrict_ff,
+                            top_pct=cohort_pct,
+                            which='top',
+                            _rdata=rdata
+                        )
+                    except Exception:
+                        res_top = None
+                    try:
+                        res_bot = None
+                        if show_bottom_cohort:
+                            res_bot = _run_rebalance(
+                                rdata_signature,
+                                tuple(st.session_state.selected_factors),
+                                start_year=analysis_years[0],
+                                end_year=analysis_years[-1],
+                                initial_aum=st.session_state.initial_aum,
+                                restrict_fossil_fuels=st.session_state.restrict_ff,
+                                top_pct=cohort_pct,
+                                which='bottom',
+                                _rdata=rdata
+                            )
+                    except Exception:
+                        res_bot = None
+
+                    # helper to compute metrics from rebalance result
+                    def cohort_metrics(res):
+                        if not res or 'portfolio_values' not in res:
+                            return None
+                        vals = list(res.get('portfolio_values', []))
+                        if not vals:
+                            return None
+                        start = vals[0]
+                        end = vals[-1]
+                        total_return = ((end / start) - 1) * 100 if start and start > 0 else 0.0
+                        years_n = len(results['years']) if 'years' in results else max(1, len(analysis_years))
+                        try:
+                            cagr = (((end / start) ** (1 / years_n)) - 1) * 100 if start and start > 0 else 0.0
+                        except Exception:
+                            cagr = 0.0
+                        return {'start': start, 'end': end, 'total_return': total_return, 'cagr': cagr}
+
+                    top_metrics = cohort_metrics(res_top)
+                    bot_metrics = cohort_metrics(res_bot) if res_bot is not None else None
+
+                    # compute benchmark final for alpha calc
+                    benchmark_final = None
+                    if 'benchmark_returns' in results and results['benchmark_returns']:
+                        try:
+                            benchmark_final = st.session_state.initial_aum * np.prod(1 + np.asarray(results['benchmark_returns']) / 100)
+                        except Exception:
+                            benchmark_final = None
+
+                    col_top, col_bot = st.columns([1, 1])
+                    with col_top:
+                        if top_metrics:
+                            st.metric(f"Top {cohort_pct}% Final Value", f"${top_metrics['end']:,.2f}")
+                            st.metric(f"Top {cohort_pct}% Total Return", f"{top_metrics['total_return']:.2f}%")
+                            st.metric(f"Top {cohort_pct}% CAGR", f"{top_metrics['cagr']:.2f}%")
+                            if benchmark_final is not None:
+                                alpha_top = ((top_metrics['end'] / benchmark_final) - 1) * 100
+                                st.metric(f"Top {cohort_pct}% Alpha vs Russell 2000", f"{alpha_top:.2f}%")
+                        else:
+                            st.write(f"Top {cohort_pct}%: no final AUM available")
+                    with col_bot:
+                        if bot_metrics:
+                            st.metric(f"Bottom {cohort_pct}% Final Value", f"${bot_metrics['end']:,.2f}")
+                            st.metric(f"Bottom {cohort_pct}% Total Return", f"{bot_metrics['total_return']:.2f}%")
+                            st.metric(f"Bottom {cohort_pct}% CAGR", f"{bot_metrics['cagr']:.2f}%")
+                            if benchmark_final is not None:
+                                alpha_bot = ((bot_metrics['end'] / benchmark_final) - 1) * 100
+                                st.metric(f"Bottom {cohort_pct}% Alpha vs Russell 2000", f"{alpha_bot:.2f}%")
+                        else:
+                            st.write(f"Bottom {cohort_pct}%: no final AUM available")
+
+                    # Second pass: generate and display the figure
+                    fig_cohort = plot_top_bottom_percent(
+                        rdata=rdata,
+                        factors=factor_objects,
+                        years=analysis_years,
+                        percent=cohort_pct,
+                        show_bottom=show_bottom_cohort,
+                        restrict_fossil_fuels=st.session_state.restrict_ff,
+                        benchmark_returns=results.get('benchmark_returns'),
+                        benchmark_label='Russell 2000',
+                        initial_investment=st.session_state.initial_aum,
+                        verbose=False,
+                        baseline_portfolio_values=results['portfolio_values'],
+                        use_rebalance_for_selection=True,
+                        return_details=False
+                    )
+
+                    if fig_cohort is not None:
+                        st.pyplot(fig_cohort)
+                        st.success(f"Cohort analysis complete! Comparing top {cohort_pct}% vs bottom {cohort_pct}% cohorts.")
+
+                except Exception as e:
+                    st.error(f"Error generating cohort analysis: {str(e)}")
+                    if verbosity_level >= 2:
+                        st.exception(e)
+
+
 def main():
     # Check password first
     if not check_password():
@@ -424,49 +730,22 @@ def main():
                     try:
                         sectors_to_use = selected_sectors if sector_filter_enabled else None
 
-                        rdata = load_data(
-                            restrict_fossil_fuels=restrict_fossil_fuels,
-                            use_supabase=True,
-                            data_path=None,
-                            show_loading_progress=show_loading,
-                            sectors=sectors_to_use
-                        )
+                        sectors_key = tuple(sorted(sectors_to_use)) if sectors_to_use else None
 
-                        # Data preprocessing
-                        rdata['Ticker'] = rdata['Ticker-Region'].dropna().apply(
-                            lambda x: x.split('-')[0].strip()
-                        )
-                        rdata['Year'] = pd.to_datetime(rdata['Date']).dt.year
+                        # Fetch here so the loading progress is shown on this run
+                        _load_and_prep(restrict_fossil_fuels, sectors_key, _show_loading=show_loading)
 
                         # If the user selected an analysis period, filter the loaded data to that range
                         try:
-                            rdata = rdata[(rdata['Year'] >= int(start_year)) & (rdata['Year'] <= int(end_year))]
+                            period = (int(start_year), int(end_year))
                         except Exception:
                             # If filtering fails, keep full dataset but warn the user
                             st.warning('Unable to filter loaded data by selected years; using full dataset instead.')
+                            period = (None, None)
 
-                        # Keep only relevant columns (include Market Capitalization for cap-weighted portfolios)
-                        cols_to_keep = ['Ticker', 'Year']
-                        if 'Ending Price' in rdata.columns:
-                            cols_to_keep.append('Ending Price')
-                        elif 'Ending_Price' in rdata.columns:
-                            rdata['Ending Price'] = rdata['Ending_Price']
-                            cols_to_keep.append('Ending Price')
-                        
-                        # Add Market Capitalization if available (needed for cap-weighted portfolios)
-                        if 'Market Capitalization' in rdata.columns:
-                            cols_to_keep.append('Market Capitalization')
-                        elif 'Market_Capitalization' in rdata.columns:
-                            rdata['Market Capitalization'] = rdata['Market_Capitalization']
-                            cols_to_keep.append('Market Capitalization')
-
-                        for factor in FACTOR_MAP.keys():
-                            if factor in rdata.columns:
-                                cols_to_keep.append(factor)
-
-                        rdata = rdata[cols_to_keep]
-
-                        st.session_state.rdata = rdata
+                        # Keep only the key in session state; the frame itself is a shared cached resource
+                        st.session_state.rdata_key = (restrict_fossil_fuels, sectors_key) + period
+                        rdata, _ = get_rdata()
                         st.session_state.data_loaded = True
 
                         st.success(f"Data loaded successfully! {len(rdata)} records from {rdata['Year'].min()} to {rdata['Year'].max()}")
@@ -493,19 +772,18 @@ def main():
                     else:
                         with st.spinner("Running portfolio backtest..."):
                             try:
-                                # Create factor objects
-                                factor_objects = [FACTOR_MAP[name]() for name in selected_factor_names]
-                                
-                                # Run rebalancing
-                                results = rebalance_portfolio(
-                                    st.session_state.rdata,
-                                    factor_objects,
+                                # Run rebalancing (cached on data hash + settings)
+                                rdata, rdata_signature = get_rdata()
+                                results = _run_rebalance(
+                                    rdata_signature,
+                                    tuple(selected_factor_names),
                                     start_year=int(start_year),
                                     end_year=int(end_year),
                                     initial_aum=initial_aum,
-                                    verbosity=verbosity_level,
                                     restrict_fossil_fuels=restrict_fossil_fuels,
-                                    use_market_cap_weight=use_market_cap_weight
+                                    use_market_cap_weight=use_market_cap_weight,
+                                    _rdata=rdata,
+                                    _verbosity=verbosity_level
                                 )
                                 
                                 st.session_state.results = results
@@ -557,7 +835,7 @@ def main():
             with col4:
                 if 'benchmark_returns' in results and results['benchmark_returns']:
                     # Convert percentages to decimals before calculating
-                    benchmark_final = st.session_state.initial_aum * np.prod([1 + r/100 for r in results['benchmark_returns']])
+                    benchmark_final = st.session_state.initial_aum * np.prod(1 + np.asarray(results['benchmark_returns']) / 100)
                     alpha = ((final_value / benchmark_final) - 1) * 100
                     st.metric("Alpha vs Russell 2000", f"{alpha:.2f}%")
                 else:
@@ -568,269 +846,68 @@ def main():
             # Portfolio growth chart
             st.subheader("Portfolio Growth Over Time")
             
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
+            # Rendered client-side by Plotly (no server-side matplotlib rasterization per rerun)
+            import plotly.graph_objects as go
+
             years = results['years']
             portfolio_values = results['portfolio_values']
-            
-            ax.plot(years, portfolio_values, marker='o', linewidth=2, markersize=6, label='Portfolio', color='#1f77b4')
-            
+
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=years, y=portfolio_values, mode='lines+markers', name='Portfolio',
+                                     line=dict(color='#1f77b4', width=2), marker=dict(size=6)))
+
             # Add benchmark if available
             if 'benchmark_returns' in results and results['benchmark_returns']:
-                benchmark_values = [st.session_state.initial_aum]
-                for ret in results['benchmark_returns']:
-                    # Convert percentage to decimal (ret is stored as percentage like 34.62)
-                    benchmark_values.append(benchmark_values[-1] * (1 + ret / 100))
-                ax.plot(years, benchmark_values, marker='s', linewidth=2, markersize=4, 
-                       label='Russell 2000', linestyle='--', alpha=0.7, color='#ff7f0e')
-            
-            ax.set_xlabel('Year', fontsize=12)
-            ax.set_ylabel('Portfolio Value ($)', fontsize=12)
-            ax.set_title(f'Portfolio Growth: {", ".join(st.session_state.selected_factors)}', fontsize=14, fontweight='bold')
-            ax.legend(loc='best')
-            ax.grid(True, alpha=0.3)
-            from matplotlib.ticker import FuncFormatter
-            ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
-            
-            st.pyplot(fig)
+                # Returns are stored as percentages (like 34.62); compound them in one pass
+                benchmark_values = st.session_state.initial_aum * np.cumprod(
+                    np.r_[1.0, 1 + np.asarray(results['benchmark_returns']) / 100]
+                )
+                fig.add_trace(go.Scatter(x=years, y=benchmark_values, mode='lines+markers', name='Russell 2000',
+                                         line=dict(color='#ff7f0e', width=2, dash='dash'),
+                                         marker=dict(size=4, symbol='square'), opacity=0.7))
+
+            fig.update_layout(
+                title=dict(text=f'Portfolio Growth: {", ".join(st.session_state.selected_factors)}', font=dict(size=16)),
+                xaxis_title='Year',
+                yaxis_title='Portfolio Value ($)',
+                yaxis_tickprefix='$',
+                yaxis_tickformat=',.0f',
+                hovermode='x unified',
+                height=500,
+            )
+
+            st.plotly_chart(fig, use_container_width=True)
             
             st.divider()
             
-            # Top/Bottom Cohort Analysis
-            st.subheader("Top vs Bottom Cohort Analysis")
-            
-            with st.expander("View Top/Bottom Portfolio Performance", expanded=False):
-                st.markdown("""
-                This visualization compares the performance of the **top N%** and **bottom N%** 
-                of stocks selected by your factors against the benchmark and the main portfolio.
-                """)
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    cohort_pct = st.slider(
-                        "Select Cohort Percentage",
-                        min_value=1,
-                        max_value=100,
-                        value=10,
-                        step=1,
-                        help="Percentage of stocks to include in top/bottom cohorts (1-100%)"
-                    )
-                with col2:
-                    show_bottom_cohort = st.checkbox("Show Bottom Cohort", value=True, help="Display the bottom-performing cohort")
-                
-                if st.button("Generate Top/Bottom Analysis", key="top_bottom_btn"):
-                    with st.spinner("Generating cohort analysis..."):
-                        try:
-                            # Get factor objects (instantiate classes)
-                            factor_objects = [FACTOR_MAP[name]() for name in st.session_state.selected_factors]
-
-                            # Get years from results (ensure user re-runs analysis after changing the period)
-                            analysis_years = results['years']
-
-                            # First pass: get diagnostics to understand selection and dropped tickers
-                            details = plot_top_bottom_percent(
-                                rdata=st.session_state.rdata,
-                                factors=factor_objects,
-                                years=analysis_years,
-                                percent=cohort_pct,
-                                show_bottom=show_bottom_cohort,
-                                restrict_fossil_fuels=st.session_state.restrict_ff,
-                                benchmark_returns=results.get('benchmark_returns'),
-                                benchmark_label='Russell 2000',
-                                initial_investment=st.session_state.initial_aum,
-                                verbose=False,
-                                baseline_portfolio_values=results['portfolio_values'],
-                                use_rebalance_for_selection=True,
-                                return_details=True
-                            )
-
-                            # Instead of showing raw diagnostics JSON, present concise metrics:
-                            # final AUM and percent gain for Top and Bottom cohorts (final year).
-                            top_start = top_end = bot_start = bot_end = None
-                            # Extract numbers from details if present
-                            if isinstance(details, dict) and 'per_year' in details and details['per_year']:
-                                last = details['per_year'][-1]
-                                top = last.get('top', {})
-                                bot = last.get('bottom', {})
-                                top_start = top.get('start')
-                                top_end = top.get('end')
-                                bot_start = bot.get('start') if bot else None
-                                bot_end = bot.get('end') if bot else None
-                            else:
-                                # Fallback: call rebalance_portfolio directly to compute top/bottom series
-                                try:
-                                    res_top = rebalance_portfolio(
-                                        st.session_state.rdata,
-                                        factor_objects,
-                                        start_year=analysis_years[0],
-                                        end_year=analysis_years[-1],
-                                        initial_aum=st.session_state.initial_aum,
-                                        verbosity=0,
-                                        restrict_fossil_fuels=st.session_state.restrict_ff,
-                                        top_pct=cohort_pct,
-                                        which='top'
-                                    )
-                                    res_bot = rebalance_portfolio(
-                                        st.session_state.rdata,
-                                        factor_objects,
-                                        start_year=analysis_years[0],
-                                        end_year=analysis_years[-1],
-                                        initial_aum=st.session_state.initial_aum,
-                                        verbosity=0,
-                                        restrict_fossil_fuels=st.session_state.restrict_ff,
-                                        top_pct=cohort_pct,
-                                        which='bottom'
-                                    ) if show_bottom_cohort else None
-                                    if isinstance(res_top, dict) and 'portfolio_values' in res_top:
-                                        tv = list(res_top.get('portfolio_values', []))
-                                        if len(tv) >= 2:
-                                            top_start = tv[-2]
-                                            top_end = tv[-1]
-                                        elif len(tv) == 1:
-                                            top_start = top_end = tv[0]
-                                    if res_bot and isinstance(res_bot, dict) and 'portfolio_values' in res_bot:
-                                        bv = list(res_bot.get('portfolio_values', []))
-                                        if len(bv) >= 2:
-                                            bot_start = bv[-2]
-                                            bot_end = bv[-1]
-                                        elif len(bv) == 1:
-                                            bot_start = bot_end = bv[0]
-                                except Exception:
-                                    pass
-
-                            # Display overall growth metrics (start -> finish) for Top/Bottom using rebalance results
-                            try:
-                                # Compute top/bottom rebalance series to get full portfolio values
-                                res_top = rebalance_portfolio(
-                                    st.session_state.rdata,
-                                    factor_objects,
-                                    start_year=analysis_years[0],
-                                    end_year=analysis_years[-1],
-                                    initial_aum=st.session_state.initial_aum,
-                                    verbosity=0,
-                                    restrict_fossil_fuels=st.session_state.restrict_ff,
-                                    top_pct=cohort_pct,
-                                    which='top'
-                                )
-                            except Exception:
-                                res_top = None
-                            try:
-                                res_bot = None
-                                if show_bottom_cohort:
-                                    res_bot = rebalance_portfolio(
-                                        st.session_state.rdata,
-                                        factor_objects,
-                                        start_year=analysis_years[0],
-                                        end_year=analysis_years[-1],
-                                        initial_aum=st.session_state.initial_aum,
-                                        verbosity=0,
-                                        restrict_fossil_fuels=st.session_state.restrict_ff,
-                                        top_pct=cohort_pct,
-                                        which='bottom'
-                                    )
-                            except Exception:
-                                res_bot = None
-
-                            # helper to compute metrics from rebalance result
-                            def cohort_metrics(res):
-                                if not res or 'portfolio_values' not in res:
-                                    return None
-                                vals = list(res.get('portfolio_values', []))
-                                if not vals:
-                                    return None
-                                start = vals[0]
-                                end = vals[-1]
-                                total_return = ((end / start) - 1) * 100 if start and start > 0 else 0.0
-                                years_n = len(results['years']) if 'years' in results else max(1, len(analysis_years))
-                                try:
-                                    cagr = (((end / start) ** (1 / years_n)) - 1) * 100 if start and start > 0 else 0.0
-                                except Exception:
-                                    cagr = 0.0
-                                return {'start': start, 'end': end, 'total_return': total_return, 'cagr': cagr}
-
-                            top_metrics = cohort_metrics(res_top)
-                            bot_metrics = cohort_metrics(res_bot) if res_bot is not None else None
-
-                            # compute benchmark final for alpha calc
-                            benchmark_final = None
-                            if 'benchmark_returns' in results and results['benchmark_returns']:
-                                try:
-                                    benchmark_final = st.session_state.initial_aum * np.prod([1 + r/100 for r in results['benchmark_returns']])
-                                except Exception:
-                                    benchmark_final = None
-
-                            col_top, col_bot = st.columns([1, 1])
-                            with col_top:
-                                if top_metrics:
-                                    st.metric(f"Top {cohort_pct}% Final Value", f"${top_metrics['end']:,.2f}")
-                                    st.metric(f"Top {cohort_pct}% Total Return", f"{top_metrics['total_return']:.2f}%")
-                                    st.metric(f"Top {cohort_pct}% CAGR", f"{top_metrics['cagr']:.2f}%")
-                                    if benchmark_final is not None:
-                                        alpha_top = ((top_metrics['end'] / benchmark_final) - 1) * 100
-                                        st.metric(f"Top {cohort_pct}% Alpha vs Russell 2000", f"{alpha_top:.2f}%")
-                                else:
-                                    st.write(f"Top {cohort_pct}%: no final AUM available")
-                            with col_bot:
-                                if bot_metrics:
-                                    st.metric(f"Bottom {cohort_pct}% Final Value", f"${bot_metrics['end']:,.2f}")
-                                    st.metric(f"Bottom {cohort_pct}% Total Return", f"{bot_metrics['total_return']:.2f}%")
-                                    st.metric(f"Bottom {cohort_pct}% CAGR", f"{bot_metrics['cagr']:.2f}%")
-                                    if benchmark_final is not None:
-                                        alpha_bot = ((bot_metrics['end'] / benchmark_final) - 1) * 100
-                                        st.metric(f"Bottom {cohort_pct}% Alpha vs Russell 2000", f"{alpha_bot:.2f}%")
-                                else:
-                                    st.write(f"Bottom {cohort_pct}%: no final AUM available")
-
-                            # Second pass: generate and display the figure
-                            fig_cohort = plot_top_bottom_percent(
-                                rdata=st.session_state.rdata,
-                                factors=factor_objects,
-                                years=analysis_years,
-                                percent=cohort_pct,
-                                show_bottom=show_bottom_cohort,
-                                restrict_fossil_fuels=st.session_state.restrict_ff,
-                                benchmark_returns=results.get('benchmark_returns'),
-                                benchmark_label='Russell 2000',
-                                initial_investment=st.session_state.initial_aum,
-                                verbose=False,
-                                baseline_portfolio_values=results['portfolio_values'],
-                                use_rebalance_for_selection=True,
-                                return_details=False
-                            )
-
-                            if fig_cohort is not None:
-                                st.pyplot(fig_cohort)
-                                st.success(f"Cohort analysis complete! Comparing top {cohort_pct}% vs bottom {cohort_pct}% cohorts.")
-
-                        except Exception as e:
-                            st.error(f"Error generating cohort analysis: {str(e)}")
-                            if verbosity_level >= 2:
-                                st.exception(e)
+            _cohort_analysis(results, verbosity_level)
             
             st.divider()
             
             # Year-by-year performance table
             st.subheader("Year-by-Year Performance")
             
+            # Keep the columns numeric and let the Styler format them for display
+            pv = np.asarray(results['portfolio_values'], dtype=float)
             perf_data = {
                 'Year': results['years'],
-                'Portfolio Value': [f"${v:,.2f}" for v in results['portfolio_values']],
+                'Portfolio Value': pv,
             }
+            formats = {'Portfolio Value': '${:,.2f}'}
             
             # Calculate year-over-year returns
-            if len(results['portfolio_values']) > 1:
-                yoy_returns = ['-']
-                for i in range(1, len(results['portfolio_values'])):
-                    ret = ((results['portfolio_values'][i] / results['portfolio_values'][i-1]) - 1) * 100
-                    yoy_returns.append(f"{ret:.2f}%")
-                perf_data['YoY Return'] = yoy_returns
+            if len(pv) > 1:
+                perf_data['YoY Return'] = np.concatenate([[np.nan], (pv[1:] / pv[:-1] - 1) * 100])
+                formats['YoY Return'] = '{:.2f}%'
             
             if 'benchmark_returns' in results and results['benchmark_returns']:
                 # Benchmark returns are already in percentage format (like 34.62)
-                perf_data['Benchmark Return'] = ['-'] + [f"{r:.2f}%" for r in results['benchmark_returns']]
+                perf_data['Benchmark Return'] = np.concatenate(
+                    [[np.nan], np.asarray(results['benchmark_returns'], dtype=float)])
+                formats['Benchmark Return'] = '{:.2f}%'
             
             perf_df = pd.DataFrame(perf_data)
-            st.dataframe(perf_df, use_container_width=True, hide_index=True)
+            st.dataframe(perf_df.style.format(formats, na_rep='-'), use_container_width=True, hide_index=True)
             
             st.divider()
             
@@ -1,204 +1,252 @@
-from .market_object import MarketObject
+from .market_object import MarketObject, clean_column_labels
 from .portfolio import Portfolio
 import numpy as np
 import pandas as pd
 from .factors_doc import FACTOR_DOCS
-from .factor_utils import normalize_series
+from .factor_utils import normalize_values, select_ranked
+
+# Yearly benchmark returns in percent from Factset (September), indexed by year - _BENCH_START
+_BENCH_START = 2002
+_BENCH = np.array([
+    34.62, 17.48, 16.56, 8.65, 11.01,
+    -15.63, -11.08, 11.89, -4.73, 30.01,
+    28.22, 2.6, -0.09, 13.71, 19.11,
+    13.8, -10.21, -1.03, 46.21, -24.48, 7.23
+])
+_BENCH.flags.writeable = False
+
+# Risk-free rate lookup from FRED (October 1), indexed by year - _BENCH_START
+_RISK_FREE = np.array([
+    0.0156, 0.0102, 0.0182, 0.0349, 0.0473,
+    0.0462, 0.0148, 0.0014, 0.0014, 0.0010,
+    0.0015, 0.0005, 0.0002, 0.0001, 0.0033,
+    0.0110, 0.0220, 0.0179, 0.0009, 0.0003, 0.0306
+])
+_RISK_FREE.flags.writeable = False
+_RISK_FREE_SOURCE = "FRED (Oct 1)"
+
+def _normed_scores(stocks, factor_cols, directions):
+    """
+    Winsorize + z-score factor columns of a market frame.
+
+    Args:
+        factor_cols (tuple): column names to score, read in one pass.
+        directions (tuple): matching `higher_is_better` flags.
+
+    Returns:
+        tuple: one (tickers, scores) pair of numpy arrays per column, with NaN
+        scores dropped, in frame order.
+    """
+    raw = stocks[list(factor_cols)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    index = stocks.index.to_numpy()
+    results = []
+    for j, higher_is_better in enumerate(directions):
+        normed = normalize_values(raw[:, j], higher_is_better=higher_is_better)
+        keep = ~np.isnan(normed)
+        results.append((index[keep], normed[keep]))
+    return tuple(results)
+
+
+def _higher_is_better(factor_col):
+    # Determine direction from FACTOR_DOCS if available
+    return FACTOR_DOCS.get(factor_col, {}).get('higher_is_better', True)
+
+
+def _fallback_scores(factor, market, stocks):
+    """Score a factor without a matching column through per-ticker `factor.get`."""
+    # One call per ticker, keeping finite numeric values (numpy scalars included)
+    factor_values = {}
+    for ticker in stocks.index:
+        value = factor.get(ticker, market)
+        try:
+            if np.isfinite(value):
+                factor_values[ticker] = float(value)
+        except (TypeError, ValueError):
+            continue
+    tickers = np.array(list(factor_values.keys()), dtype=object)
+    scores = np.array(list(factor_values.values()), dtype=float)
+    return tickers, scores
+
 
 def calculate_holdings(factor, aum, market, restrict_fossil_fuels=False, top_pct=10, which='top', use_market_cap_weight=False):
-    # Apply sector restrictions if enabled
-    if restrict_fossil_fuels:
-        industry_col = 'FactSet Industry'
-        if industry_col in market.stocks.columns:
-            fossil_keywords = ['oil', 'gas', 'coal', 'energy', 'fossil']
-            series = market.stocks[industry_col].astype(str).str.lower()
-            mask = series.apply(
-                lambda x: not any(kw in x for kw in fossil_keywords) if pd.notna(x) else True)
-            # Report which tickers are being removed in this step
-            try:
-                removed_tickers = list(market.stocks.loc[~mask].index)
-                if removed_tickers:
-                    print(f"Fossil filter (holdings) removed {len(removed_tickers)} tickers: {', '.join(removed_tickers[:25])}{' ...' if len(removed_tickers) > 25 else ''}")
-            except Exception:
-                pass
-            market.stocks = market.stocks[mask].copy()
-
-    # Get eligible stocks for factor calculation
-    # Prefer vectorized series from market.stocks when available so we can normalize
+    # Get eligible stocks for factor calculation (sector restrictions applied if enabled)
+    stocks = market.eligible_stocks(restrict_fossil_fuels)
+
+    # Prefer vectorized series from the eligible stocks when available so we can normalize
     factor_col = getattr(factor, 'column_name', str(factor))
-    factor_values = {}
 
-    if factor_col in market.stocks.columns:
-        raw_series = pd.to_numeric(market.stocks[factor_col], errors='coerce')
-        # Determine direction from FACTOR_DOCS if available
-        meta = FACTOR_DOCS.get(factor_col, {})
-        higher_is_better = meta.get('higher_is_better', True)
+    if factor_col in stocks.columns:
         # Normalize series (winsorize + zscore) and invert if needed so higher == better
-        normed = normalize_series(raw_series, higher_is_better=higher_is_better)
-        factor_values = normed.dropna().to_dict()
+        tickers, scores = _normed_scores(stocks, (factor_col,), (_higher_is_better(factor_col),))[0]
     else:
-        # Fallback to original per-ticker get() when column not present
-        factor_values = {
-            ticker: factor.get(ticker, market)
-            for ticker in market.stocks.index
-            if isinstance(factor.get(ticker, market), (int, float))
-        }
-    
-    # ...existing code...
-    
-    if len(factor_values) == 0:
+        tickers, scores = _fallback_scores(factor, market, stocks)
+
+    return _build_portfolio(tickers, scores, aum, market, top_pct, which, use_market_cap_weight)
+
+
+def calculate_holdings_batch(factors, aum, market, restrict_fossil_fuels=False, top_pct=10, which='top', use_market_cap_weight=False):
+    """
+    Build one portfolio per factor from a single pass over `market.stocks`.
+
+    Equivalent to calling `calculate_holdings` for each factor with the same
+    `aum` (the allocation per factor), but all column-backed factors are read
+    and normalized together.
+
+    Returns:
+        list: Portfolio objects in the order of `factors`.
+    """
+    # Get eligible stocks for factor calculation (sector restrictions applied if enabled)
+    stocks = market.eligible_stocks(restrict_fossil_fuels)
+
+    factor_cols = [getattr(factor, 'column_name', str(factor)) for factor in factors]
+    batch_cols = tuple(dict.fromkeys(col for col in factor_cols if col in stocks.columns))
+    scored = {}
+    if batch_cols:
+        normed = _normed_scores(stocks, batch_cols, tuple(_higher_is_better(col) for col in batch_cols))
+        scored = dict(zip(batch_cols, normed))
+
+    portfolios = []
+    for factor, factor_col in zip(factors, factor_cols):
+        if factor_col in scored:
+            tickers, scores = scored[factor_col]
+        else:
+            tickers, scores = _fallback_scores(factor, market, stocks)
+        portfolios.append(_build_portfolio(tickers, scores, aum, market, top_pct, which, use_market_cap_weight))
+    return portfolios
+
+
+def _unique_tickers(tickers, scores):
+    """
+    Collapse repeated tickers (e.g. 'AAA-US' and 'AAA-CA' both become 'AAA') the way a
+    ticker -> score dict would: the last score wins, kept at the ticker's first position.
+    """
+    index = pd.Index(tickers)
+    if index.is_unique:
+        return tickers, scores
+    last = pd.Series(scores, index=index).groupby(level=0, sort=False).last()
+    return last.index.to_numpy(dtype=object), last.to_numpy(dtype=float)
+
+
+def _build_portfolio(tickers, scores, aum, market, top_pct, which, use_market_cap_weight):
+    """Select the top/bottom `top_pct`% of scored tickers and allocate `aum` across them."""
+    # Each ticker is held at most once, and the selection size counts distinct tickers
+    tickers, scores = _unique_tickers(tickers, scores)
+    if len(tickers) == 0:
         # Return empty portfolio instead of crashing
         return Portfolio(name=f"Portfolio_{market.t}")
-    
-    sorted_securities = sorted(factor_values.items(), key=lambda x: x[1], reverse=True)
 
-    # Select the top or bottom `top_pct`% of securities (default 10%)
-    import math
-    n_select = max(1, math.floor(len(sorted_securities) * (top_pct / 100.0))) if sorted_securities else 0
-    if n_select == 0:
-        selected = []
-    else:
-        if which == 'top':
-            selected = sorted_securities[:n_select]
-        else:
-            # bottom: take the weakest n_select securities
-            selected = sorted_securities[-n_select:]
+    # Select the top or bottom `top_pct`% of securities (default 10%), best first
+    picks = select_ranked(scores, top_pct=top_pct, which=which)
+    selected = tickers[picks]
 
-    # Calculate number of shares for each selected security
+    # Calculate number of shares for each selected security from their entry prices
+    # (NaN where there is no valid price)
     portfolio_new = Portfolio(name=f"Portfolio_{market.t}")
-    
+    prices = market.get_prices(selected)
+    priced = ~np.isnan(prices)
+
     if use_market_cap_weight:
         # Market capitalization-based weighting (similar to Russell 2000)
-        # Collect market cap and price for each selected ticker, then allocate
-        market_caps = {}
-        prices = {}
-        for ticker, _ in selected:
-            # Try to get market cap from the data
-            if 'Market Capitalization' in market.stocks.columns:
-                try:
-                    market_cap = market.stocks.loc[ticker, 'Market Capitalization']
-                    if isinstance(market_cap, (pd.Series, np.ndarray)):
-                        market_cap = market_cap.iloc[0] if len(market_cap) > 0 else None
-                    if pd.notna(market_cap) and market_cap > 0:
-                        market_caps[ticker] = float(market_cap)
-                except (KeyError, IndexError):
-                    pass
-            # also capture entry price availability
-            price = market.get_price(ticker)
-            if price is not None and price > 0:
-                prices[ticker] = price
-
-        # If we have market caps and at least one valid price, use them for weighting
-        valid_caps = {t: c for t, c in market_caps.items() if t in prices}
-        if valid_caps:
-            total_market_cap = sum(valid_caps.values())
-            for ticker, cap in valid_caps.items():
-                # Weight by market cap: (ticker_market_cap / total_market_cap) * AUM
-                weight = cap / total_market_cap if total_market_cap > 0 else 0
-                dollar_investment = weight * aum
-                price = prices.get(ticker)
-                if price is not None and price > 0 and dollar_investment > 0:
-                    shares = dollar_investment / price
-                    portfolio_new.add_investment(ticker, shares)
+        caps = np.full(len(selected), np.nan)
+        if 'Market Capitalization' in market.stocks.columns:
+            cap_col = pd.to_numeric(market.stocks['Market Capitalization'], errors='coerce')
+            cap_col = cap_col[~cap_col.index.duplicated(keep='first')]
+            caps = cap_col.reindex(pd.Index(selected, dtype=object)).to_numpy(dtype=float)
+
+        # If we have market caps for tickers with a valid price, use them for weighting
+        capped = priced & (caps > 0)
+        if capped.any():
+            # Weight by market cap: (ticker_market_cap / total_market_cap) * AUM
+            dollar_investment = caps[capped] / caps[capped].sum() * aum
+            funded = dollar_investment > 0
+            portfolio_new.add_investments_bulk(
+                selected[capped][funded], dollar_investment[funded] / prices[capped][funded])
             # If for some reason no shares were added (e.g., rounding), fallback to equal among priced tickers
-            if not portfolio_new.investments and prices:
-                valid_tickers = list(prices.keys())
-                equal_investment = aum / len(valid_tickers)
-                for t in valid_tickers:
-                    shares = equal_investment / prices[t]
-                    portfolio_new.add_investment(t, shares)
+            if not funded.any():
+                portfolio_new.add_investments_bulk(selected[priced], aum / priced.sum() / prices[priced])
+        elif not priced.any():
+            print(f"Warning: No valid priced tickers for year {market.t}; returning empty portfolio.")
         else:
             # Fallback to equal weighting among tickers that have valid prices
-            valid_tickers = [t for t, _ in selected if market.get_price(t) is not None and market.get_price(t) > 0]
-            if not valid_tickers:
-                print(f"Warning: No valid priced tickers for year {market.t}; returning empty portfolio.")
-            else:
-                equal_investment = aum / len(valid_tickers)
-                for ticker in valid_tickers:
-                    price = market.get_price(ticker)
-                    if price is not None and price > 0:
-                        shares = equal_investment / price
-                        portfolio_new.add_investment(ticker, shares)
+            portfolio_new.add_investments_bulk(selected[priced], aum / priced.sum() / prices[priced])
     else:
         # Equal dollar weighting (allocate only to tickers with valid entry prices)
-        valid_tickers = [t for t, _ in selected if market.get_price(t) is not None and market.get_price(t) > 0]
-        if not valid_tickers and selected:
+        if not priced.any():
             # nothing priced; warn and return empty portfolio
             print(f"Warning: No valid priced tickers for equal-weighting in year {market.t}; returning empty portfolio.")
         else:
-            equal_investment = aum / len(valid_tickers) if valid_tickers else 0
-            for ticker in valid_tickers:
-                price = market.get_price(ticker)
-                if price is not None and price > 0:
-                    shares = equal_investment / price
-                    portfolio_new.add_investment(ticker, shares)
+            portfolio_new.add_investments_bulk(selected[priced], aum / priced.sum() / prices[priced])
 
     return portfolio_new
 
 def calculate_growth(portfolio, next_market, current_market, verbosity=0):
-    # Calculate start value using the current market
     total_start_value = 0
-    for factor_portfolio in portfolio:
-        total_start_value += factor_portfolio.present_value(current_market)
-
-    # Calculate end value using next market, handling missing stocks
     total_end_value = 0
     for factor_portfolio in portfolio:
-        for inv in factor_portfolio.investments:
-            ticker = inv["ticker"]
-            end_price = next_market.get_price(ticker)
-            if end_price is not None:
-                total_end_value += inv["number_of_shares"] * end_price
-            else:
-                entry_price = current_market.get_price(ticker)
-                if entry_price is not None:
-                    total_end_value += inv["number_of_shares"] * entry_price
-                    if verbosity == 3:
+        tickers, shares = factor_portfolio.as_arrays()
+        if len(tickers) == 0:
+            continue
+
+        # Calculate start value using the current market
+        entry_prices = current_market.get_prices(tickers)
+        total_start_value += float(np.nansum(shares * entry_prices))
+
+        # Calculate end value using next market; stocks missing from it are liquidated at entry price
+        end_prices = next_market.get_prices(tickers)
+        missing = np.isnan(end_prices)
+        if missing.any():
+            end_prices = np.where(missing, entry_prices, end_prices)
+            if verbosity == 3:
+                for ticker, entry_price in zip(tickers[missing], entry_prices[missing]):
+                    if not np.isnan(entry_price):
                         print(f"{ticker} - Missing in {next_market.t}, liquidating at entry price: {entry_price}")
+        total_end_value += float(np.nansum(shares * end_prices))
 
     # Calculate growth
     growth = (total_end_value - total_start_value) / total_start_value if total_start_value else 0
     return growth, total_start_value, total_end_value
 
 
+def _max_drawdown(values):
+    """Largest peak-to-trough decline of a value series, as a (negative) fraction."""
+    return (values / np.maximum.accumulate(values)).min() - 1
+
+
 def rebalance_portfolio(data, factors, start_year, end_year, initial_aum, verbosity=0, restrict_fossil_fuels=False, top_pct=10, which='top', use_market_cap_weight=False):
     aum = initial_aum
     years = [start_year] # Start with the initial year
     portfolio_returns = []  # Store yearly returns for Information Ratio
+    log_returns = np.empty(max(end_year - start_year, 0))  # Same returns in log space for compounding
     benchmark_returns = []  # Store benchmark returns for comparison
     portfolio_values = [aum]  # track total AUM over time
     
     # Ensure verbosity is not None
     verbosity = 0 if verbosity is None else verbosity
     
-    # Risk-free rate lookup from FRED (October 1)
-    risk_free_rate_lookup = {
-        2002: 0.0156, 2003: 0.0102, 2004: 0.0182, 2005: 0.0349, 2006: 0.0473,
-        2007: 0.0462, 2008: 0.0148, 2009: 0.0014, 2010: 0.0014, 2011: 0.0010,
-        2012: 0.0015, 2013: 0.0005, 2014: 0.0002, 2015: 0.0001, 2016: 0.0033,
-        2017: 0.0110, 2018: 0.0220, 2019: 0.0179, 2020: 0.0009, 2021: 0.0003, 2022: 0.0306
-    }
-    risk_free_rate_source = "FRED (Oct 1)"
+    risk_free_rate_source = _RISK_FREE_SOURCE
 
-    for year in range(start_year, end_year):
+    # Clean column labels once here so each yearly MarketObject can skip it
+    data = clean_column_labels(data)
 
-        market = MarketObject(data.loc[data['Year'] == year], year)
-        yearly_portfolio = []
+    # Row positions per year, computed once so each year is a gather rather than a full scan
+    rows_by_year = data.groupby('Year', sort=False).indices
+    no_rows = np.empty(0, dtype=np.intp)
 
-        for factor in factors:
-            factor_portfolio = calculate_holdings(
-                factor=factor,
-                aum=aum / len(factors),
-                market=market,
-                restrict_fossil_fuels=restrict_fossil_fuels,
-                top_pct=top_pct,
-                which=which,
-                use_market_cap_weight=use_market_cap_weight
-            )
-            yearly_portfolio.append(factor_portfolio)
+    for i, year in enumerate(range(start_year, end_year)):
+
+        market = MarketObject(data.take(rows_by_year.get(year, no_rows)), year, trusted=True)
+        yearly_portfolio = calculate_holdings_batch(
+            factors=factors,
+            aum=aum / len(factors),
+            market=market,
+            restrict_fossil_fuels=restrict_fossil_fuels,
+            top_pct=top_pct,
+            which=which,
+            use_market_cap_weight=use_market_cap_weight
+        )
 
         if year < end_year:
-            next_market = MarketObject(data.loc[data['Year'] == year + 1], year + 1)
+            next_market = MarketObject(data.take(rows_by_year.get(year + 1, no_rows)), year + 1, trusted=True)
             growth, total_start_value, total_end_value = calculate_growth(yearly_portfolio, next_market, market, verbosity)
 
             if verbosity is not None and verbosity >= 2:
@@ -209,6 +257,8 @@ def rebalance_portfolio(data, factors, start_year, end_year, initial_aum, verbos
 
             # Append annual return (growth) to portfolio_returns
             portfolio_returns.append(growth)
+            with np.errstate(divide='ignore'):
+                log_returns[i] = np.log1p(growth)
 
             # Get benchmark return for the year (replace it as needed)
             benchmark_return = get_benchmark_return(year)  # Define this function based on benchmark data
@@ -233,7 +283,8 @@ def rebalance_portfolio(data, factors, start_year, end_year, initial_aum, verbos
     benchmark_returns_np = np.array(benchmark_returns) / 100
     active_returns = portfolio_returns_np - benchmark_returns_np
 
-    annualized_return = (np.prod(1 + portfolio_returns_np))**(1 / len(portfolio_returns_np)) - 1
+    # Geometric mean in log space: stable over long horizons
+    annualized_return = np.expm1(log_returns.mean())
     annualized_volatility = np.std(portfolio_returns_np, ddof=1) * np.sqrt(1)  # yearly data
     active_volatility = np.std(active_returns, ddof=1)
 
@@ -242,48 +293,35 @@ def rebalance_portfolio(data, factors, start_year, end_year, initial_aum, verbos
         print(f"Annualized Volatility (Portfolio): {annualized_volatility:.2%}")
         print(f"Active Volatility (Portfolio vs Benchmark): {active_volatility:.2%}")
 
-    # Calculate Information Ratio
-    information_ratio = calculate_information_ratio(portfolio_returns, benchmark_returns, verbosity)
+    # Calculate Information Ratio from the active returns above (tracking error == active volatility)
+    information_ratio = float(active_returns.mean() / active_volatility) if active_volatility != 0 else None
+    if information_ratio is not None and verbosity is not None and verbosity >= 1:
+        print(f"Information Ratio: {information_ratio:.4f}")
     if information_ratio is None and verbosity is not None and verbosity >= 1:
         print("Information Ratio could not be calculated due to zero tracking error.")
     
     # Calculate max drawdown for portfolio
-    cumulative_values = np.array(portfolio_values)
-    running_peak = np.maximum.accumulate(cumulative_values)
-    drawdowns = (cumulative_values - running_peak) / running_peak
-    max_drawdown_portfolio = np.min(drawdowns)
+    max_drawdown_portfolio = _max_drawdown(np.asarray(portfolio_values, dtype=float))
     
     # Calculate max drawdown for benchmark
-    benchmark_values = [initial_aum]
-    for ret in benchmark_returns:
-        benchmark_values.append(benchmark_values[-1] * (1 + ret / 100))
-    benchmark_values = np.array(benchmark_values)
-    benchmark_peak = np.maximum.accumulate(benchmark_values)
-    benchmark_drawdowns = (benchmark_values - benchmark_peak) / benchmark_peak
-    max_drawdown_benchmark = np.min(benchmark_drawdowns)
+    benchmark_values = initial_aum * np.concatenate(([1.0], np.cumprod(1 + benchmark_returns_np)))
+    max_drawdown_benchmark = _max_drawdown(benchmark_values)
     
     # Calculate Sharpe ratios
     sharpe_portfolio = annualized_return / annualized_volatility if annualized_volatility > 0 else 0
-    benchmark_annualized = (np.prod(1 + benchmark_returns_np))**(1 / len(benchmark_returns_np)) - 1
+    benchmark_annualized = np.expm1(np.log1p(benchmark_returns_np).mean())
     benchmark_volatility = np.std(benchmark_returns_np, ddof=1)
     sharpe_benchmark = benchmark_annualized / benchmark_volatility if benchmark_volatility > 0 else 0
     
     # Calculate yearly win rate
-    yearly_wins = 0
-    yearly_comparisons = []
-    for i, (p_ret, b_ret) in enumerate(zip(portfolio_returns, benchmark_returns)):
-        p_pct = p_ret * 100
-        b_pct = b_ret
-        win = p_pct > b_pct
-        if win:
-            yearly_wins += 1
-        yearly_comparisons.append({
-            'year': years[i+1],
-            'portfolio_return': p_pct,
-            'benchmark_return': b_pct,
-            'win': win
-        })
-    win_rate = yearly_wins / len(portfolio_returns) if len(portfolio_returns) > 0 else 0
+    portfolio_pcts = portfolio_returns_np * 100
+    benchmark_pcts = np.asarray(benchmark_returns, dtype=float)
+    wins = portfolio_pcts > benchmark_pcts
+    win_rate = float(wins.mean()) if len(wins) > 0 else 0
+    yearly_comparisons = [
+        {'year': year, 'portfolio_return': float(p_pct), 'benchmark_return': float(b_pct), 'win': bool(win)}
+        for year, p_pct, b_pct, win in zip(years[1:], portfolio_pcts, benchmark_pcts, wins)
+    ]
     
     if verbosity is not None and verbosity >= 1:
         print(f"\n==== Advanced Backtest Stats ====")
@@ -313,18 +351,58 @@ def rebalance_portfolio(data, factors, start_year, end_year, initial_aum, verbos
         'information_ratio': information_ratio
     }
     
+def make_rebalance_fn(data, factors, start_year, end_year, restrict_fossil_fuels=False, top_pct=10, which='top', use_market_cap_weight=False):
+    """
+    Specialize `rebalance_portfolio` for fixed data, factors and years.
+
+    Holdings scale linearly with AUM, so the end value of one dollar placed in
+    each factor portfolio is computed once per (year, factor). The returned
+    function replays the backtest for any starting AUM and factor weights
+    without rebuilding markets or portfolios.
+
+    Returns:
+        callable: fn(initial_aum, weights=None) -> np.ndarray of portfolio
+        values from start_year through end_year. `weights` defaults to the
+        equal split used by `rebalance_portfolio`.
+    """
+    data = clean_column_labels(data)
+    rows_by_year = data.groupby('Year', sort=False).indices
+    no_rows = np.empty(0, dtype=np.intp)
+    markets = {
+        year: MarketObject(data.take(rows_by_year.get(year, no_rows)), year, trusted=True)
+        for year in range(start_year, end_year + 1)
+    }
+
+    # End value per dollar allocated, shape (years, factors)
+    growth_per_dollar = np.zeros((max(end_year - start_year, 0), len(factors)))
+    for i, year in enumerate(range(start_year, end_year)):
+        portfolios = calculate_holdings_batch(
+            factors=factors,
+            aum=1.0,
+            market=markets[year],
+            restrict_fossil_fuels=restrict_fossil_fuels,
+            top_pct=top_pct,
+            which=which,
+            use_market_cap_weight=use_market_cap_weight
+        )
+        for k, factor_portfolio in enumerate(portfolios):
+            _, _, growth_per_dollar[i, k] = calculate_growth([factor_portfolio], markets[year + 1], markets[year])
+    growth_per_dollar.flags.writeable = False
+
+    def rebalance_fn(initial_aum, weights=None):
+        if weights is None:
+            weights = np.full(len(factors), 1.0 / len(factors))
+        yearly_growth = growth_per_dollar @ np.asarray(weights, dtype=float)
+        return initial_aum * np.concatenate(([1.0], np.cumprod(yearly_growth)))
+
+    return rebalance_fn
+
 def get_benchmark_return(year):
     """
     This function should return the benchmark return for the given year.
     """
-    # Data from Factset (September)
-    benchmark_data = {
-        2002: 34.62, 2003: 17.48, 2004: 16.56, 2005: 8.65, 2006: 11.01,
-        2007: -15.63, 2008: -11.08, 2009: 11.89, 2010: -4.73, 2011: 30.01,
-        2012: 28.22, 2013: 2.6, 2014: -0.09, 2015: 13.71, 2016: 19.11,
-        2017: 13.8, 2018: -10.21, 2019: -1.03, 2020: 46.21, 2021: -24.48, 2022: 7.23
-    }
-    return benchmark_data.get(year, 0)
+    i = int(year) - _BENCH_START
+    return float(_BENCH[i]) if 0 <= i < _BENCH.size else 0.0
 
 def calculate_information_ratio(portfolio_returns, benchmark_returns, verbosity=0):
     """
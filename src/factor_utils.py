@@ -1,3 +1,4 @@
+import math
 import numpy as np
 import pandas as pd
 from typing import Optional
@@ -23,23 +24,44 @@ def normalize_series(s: pd.Series,
     Returns:
         pd.Series with same index, numeric, NaNs preserved
     """
-    s = s.astype(float).copy()
+    values = normalize_values(s.to_numpy(dtype=float), higher_is_better=higher_is_better,
+                              method=method, zscore=zscore, winsorize_pct=winsorize_pct)
+    return pd.Series(values, index=s.index, name=s.name)
 
-    # winsorize extremes if requested
+
+def normalize_values(values: np.ndarray,
+                     higher_is_better: bool = True,
+                     method: str = 'reciprocal_if_positive',
+                     zscore: bool = True,
+                     winsorize_pct: Optional[float] = 0.005) -> np.ndarray:
+    """
+    Array kernel behind `normalize_series`: winsorize, invert and z-score a
+    float array in plain numpy, skipping the pandas per-call overhead.
+
+    Returns a new float array of the same length, NaNs preserved.
+    """
+    s = np.array(values, dtype=float)
+    valid = ~np.isnan(s)
+    n_valid = int(valid.sum())
+    if n_valid == 0:
+        if method not in ('reciprocal_if_positive', 'negate'):
+            raise ValueError(f"Unknown inversion method: {method}")
+        return s
+
+    # winsorize extremes if requested (linear interpolation, same as Series.quantile)
     if winsorize_pct and winsorize_pct > 0:
-        lower_q = s.quantile(winsorize_pct)
-        upper_q = s.quantile(1 - winsorize_pct)
-        s = s.clip(lower=lower_q, upper=upper_q)
+        lower_q, upper_q = np.quantile(s[valid], [winsorize_pct, 1 - winsorize_pct])
+        np.clip(s, lower_q, upper_q, out=s)
 
     if not higher_is_better:
         if method == 'reciprocal_if_positive':
             # If many values are non-positive, fallback to negate
-            nonpos_frac = (s.dropna() <= 0).mean() if len(s.dropna()) > 0 else 0
+            nonpos_frac = np.count_nonzero(s[valid] <= 0) / n_valid
             if nonpos_frac > 0.1:
                 s = -s
             else:
                 # replace zeros with NaN to avoid infinities
-                s = s.replace(0, np.nan)
+                s[s == 0] = np.nan
                 with np.errstate(divide='ignore', invalid='ignore'):
                     s = 1.0 / s
         elif method == 'negate':
@@ -49,8 +71,12 @@ def normalize_series(s: pd.Series,
 
     # z-score normalization
     if zscore:
-        mean = s.mean(skipna=True)
-        std = s.std(skipna=True)
+        valid = ~np.isnan(s)
+        n_valid = int(valid.sum())
+        if n_valid == 0:
+            return s
+        mean = s[valid].mean()
+        std = s[valid].std(ddof=1) if n_valid > 1 else np.nan
         if std == 0 or np.isnan(std):
             # avoid division by zero
             s = s - mean
@@ -58,3 +84,20 @@ def normalize_series(s: pd.Series,
             s = (s - mean) / std
 
     return s
+
+
+def select_ranked(scores: np.ndarray, top_pct: float = 10, which: str = 'top') -> np.ndarray:
+    """
+    Return positions of the top (or bottom) `top_pct`% of `scores`, ordered by
+    descending score. Ties keep their input order, matching a stable
+    `sorted(..., reverse=True)`. Expects one score per distinct security, so
+    the selection size counts securities rather than rows.
+    """
+    n_select = max(1, math.floor(len(scores) * (top_pct / 100.0))) if len(scores) else 0
+    if n_select == 0:
+        return np.empty(0, dtype=np.intp)
+    order = np.argsort(-np.asarray(scores, dtype=float), kind='stable')
+    if which == 'top':
+        return order[:n_select]
+    # bottom: take the weakest n_select securities
+    return order[-n_select:]
@@ -1,47 +1,88 @@
-from .market_object import load_data
+import argparse
+import sys
+from .market_object import load_data, ticker_from_region, year_from_dates
 from .calculate_holdings import rebalance_portfolio
 from .user_input import get_factors
-from .verbosity_options import get_verbosity_level
+from .verbosity_options import get_verbosity_level, VERBOSITY_OPTIONS
 from .fossil_fuel_restriction import get_fossil_fuel_restriction
 from .supabase_input import get_supabase_preference, get_data_loading_verbosity
-from .sector_selection import get_sector_selection
+from .sector_selection import get_sector_selection, SECTORS
 from Visualizations.portfolio_growth_plot import plot_portfolio_growth
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
+# Factors offered to the user, in menu order
+SELECTABLE_FACTORS = (
+    'ROE using 9/30 Data', 'ROA using 9/30 Data', '12-Mo Momentum %',
+    '6-Mo Momentum %', '1-Mo Momentum %', 'Price to Book Using 9/30 Data',
+    'Next FY Earns/P', '1-Yr Price Vol %', 'Accruals/Assets', 'ROA %',
+    '1-Yr Asset Growth %', '1-Yr CapEX Growth %', 'Book/Price'
+)
+
+# Backtest period (inclusive)
+START_YEAR, END_YEAR = 2002, 2023
+
+def build_parser():
+    """Command-line options; any option left out is asked for interactively."""
+    parser = argparse.ArgumentParser(
+        description='Backtest a factor portfolio. Options not given on the command line are '
+                    'prompted for; pass all of them to run unattended.')
+    parser.add_argument('--factors', nargs='+', choices=SELECTABLE_FACTORS, metavar='FACTOR',
+                        help='Factor names to combine (quote names with spaces)')
+    parser.add_argument('--restrict-fossil-fuels', action=argparse.BooleanOptionalAction,
+                        help='Exclude fossil fuel companies')
+    parser.add_argument('--supabase', action=argparse.BooleanOptionalAction,
+                        help='Load data from Supabase rather than a local file')
+    parser.add_argument('--show-loading', action=argparse.BooleanOptionalAction,
+                        help='Show data loading progress')
+    parser.add_argument('--sectors', nargs='+', choices=SECTORS, metavar='SECTOR',
+                        help='Sectors to include')
+    parser.add_argument('--verbosity', type=int, choices=sorted(VERBOSITY_OPTIONS),
+                        help='1 = summary, 2 = year by year, 3 = debug')
+    return parser
+
+
+def _option(value, prompt):
+    """Command-line value if given, else ask the user."""
+    return value if value is not None else prompt()
+
+
+def main(argv=None):
+    # Only an explicit argv is parsed: notebook kernels (Colab/Jupyter) put their own
+    # flags in sys.argv, and a bare main() there must stay fully interactive
+    args = build_parser().parse_args([] if argv is None else argv)
+
     ### Ask about fossil fuel restriction first ###
-    restrict_fossil_fuels = get_fossil_fuel_restriction()  # Prompt user (Yes/No)
+    restrict_fossil_fuels = _option(args.restrict_fossil_fuels, get_fossil_fuel_restriction)
 
     ### Ask about data source ###
-    use_supabase = get_supabase_preference()
+    use_supabase = _option(args.supabase, get_supabase_preference)
     
     # Ask about data loading verbosity
-    show_loading = get_data_loading_verbosity()
+    show_loading = _option(args.show_loading, get_data_loading_verbosity)
     
     # Sector selection
-    selected_sectors = get_sector_selection()
+    selected_sectors = _option(args.sectors, get_sector_selection)
 
-    # Load market data
+    # Load market data (only the backtest period)
     rdata = load_data(
         restrict_fossil_fuels=restrict_fossil_fuels, 
         use_supabase=use_supabase,
         show_loading_progress=show_loading,
-        sectors=selected_sectors
+        sectors=selected_sectors,
+        years=(START_YEAR, END_YEAR)
     )
 
     ### Data preprocessing ###
     # Note: Fossil fuel filtering is applied later in calculate_holdings() for each year
-    rdata['Ticker'] = rdata['Ticker-Region'].dropna().apply(lambda x: x.split('-')[0].strip())
-    rdata['Year'] = pd.to_datetime(rdata['Date']).dt.year
-
-    available_factors = [
-        'ROE using 9/30 Data', 'ROA using 9/30 Data', '12-Mo Momentum %',
-        '6-Mo Momentum %', '1-Mo Momentum %', 'Price to Book Using 9/30 Data',
-        'Next FY Earns/P', '1-Yr Price Vol %', 'Accruals/Assets', 'ROA %',
-        '1-Yr Asset Growth %', '1-Yr CapEX Growth %', 'Book/Price'
-    ]
-    
+    if 'Ticker' not in rdata.columns:
+        rdata['Ticker'] = ticker_from_region(rdata['Ticker-Region'])
+    if not isinstance(rdata['Ticker'].dtype, pd.CategoricalDtype):
+        rdata['Ticker'] = rdata['Ticker'].astype('category')
+    rdata['Year'] = year_from_dates(rdata['Date'])
+
+    available_factors = SELECTABLE_FACTORS
+
     # Only select columns that actually exist
     cols_to_keep = ['Ticker', 'Year']
     if 'Ending Price' in rdata.columns:
@@ -57,8 +98,8 @@ def main():
     rdata = rdata[cols_to_keep]
 
     ### Get user selections ###
-    factors = get_factors(available_factors)
-    verbosity_level = get_verbosity_level()
+    factors = get_factors(available_factors, selections=args.factors)
+    verbosity_level = _option(args.verbosity, get_verbosity_level)
 
     # Separate factor objects from their names for use downstream
     factor_objects, factor_names = (zip(*factors) if factors else ([], []))
@@ -67,7 +108,7 @@ def main():
     # ...existing code...
     results = rebalance_portfolio(
         rdata, list(factor_objects),
-        start_year=2002, end_year=2023,
+        start_year=START_YEAR, end_year=END_YEAR,
         initial_aum=1,
         verbosity=verbosity_level,
         restrict_fossil_fuels=restrict_fossil_fuels
@@ -86,4 +127,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -1,22 +1,149 @@
+import functools
+import re
+from typing import Dict, NamedTuple, Tuple
 import pandas as pd
 import numpy as np
-from .supabase_client import load_supabase_data
+from .supabase_client import load_supabase_data, FOSSIL_KEYWORDS
 import os
+from pathlib import Path
+
+# HARDCODED mapping - Supabase column names -> Expected column names
+COLUMN_MAPPING = {
+    # Core columns
+    'ID': 'ID',
+    'Security_Name': 'Security Name',
+    'Ticker-Region': 'Ticker-Region',
+    'Russell_2000_Port_Weight': 'Russell 2000 Port. Weight',
+    'Ending_Price': 'Ending Price',
+    'Market_Capitalization': 'Market Capitalization',
+    'Date': 'Date',
+    'FactSet_Industry': 'FactSet Industry',
+    'Scotts_Sector_5': "Scott's Sector (5)",
+
+    # Factor columns - EXACT mapping from Supabase
+    'ROE_using_9-30_Data': 'ROE using 9/30 Data',
+    'ROA_using_9-30_Data': 'ROA using 9/30 Data',
+    'Price_to_Book_Using_9-30_Data': 'Price to Book Using 9/30 Data',
+    'Next_FY_Earns-P': 'Next FY Earns/P',
+    '12-Mo_Momentum': '12-Mo Momentum %',
+    '6-Mo_Momentum': '6-Mo Momentum %',
+    '1-Mo_Momentum': '1-Mo Momentum %',
+    '1-Yr_Price_Vol': '1-Yr Price Vol %',
+    'Accruals-Assets': 'Accruals/Assets',
+    'ROA': 'ROA %',
+    '1-Yr_Asset_Growth': '1-Yr Asset Growth %',
+    '1-Yr_CapEX_Growth': '1-Yr CapEX Growth %',
+    'Book-Price': 'Book/Price',
+    'Next-Years_Return': "Next-Year's Return %",
+    'Next-Years_Active_Return': "Next-Year's Active Return %",
+
+    # Financial data columns
+    'NI_Millions': 'NI, $Millions',
+    'OpCF_Millions': 'OpCF, $Millions',
+    'Latest_Assets_Millions': 'Latest Assets, $Millions',
+    'Prior_Years_Assets_Millions': "Prior Year's Assets, $Millions",
+    'Book_Value_Per_Share': 'Book Value Per Share $',
+    'CapEx_Millions': 'CapEx, $Millions',
+    'Prior_Years_CapEx_Millions': "Prior Year's CapEx, $Millions",
+    'Earnings_Surprise': 'Earnings Surprise %',
+    'EarningsReportedLast': 'Earnings Reported Last',
+    'Avg_Daily_3-Mo_Volume_Mills': 'Avg Daily 3-Mo Volume Mills $',
+}
+
+# Expected column names -> Supabase column names
+_SOURCE_COLUMN_NAMES = {expected: source for source, expected in COLUMN_MAPPING.items()}
+
+# Factor columns kept on each MarketObject
+AVAILABLE_FACTORS = [
+    'ROE using 9/30 Data', 'ROA using 9/30 Data', '12-Mo Momentum %', '1-Mo Momentum %',
+    'Price to Book Using 9/30 Data', 'Next FY Earns/P', '1-Yr Price Vol %', 'Accruals/Assets',
+    'ROA %', '1-Yr Asset Growth %', '1-Yr CapEX Growth %', 'Book/Price',
+    "Next-Year's Return %", "Next-Year's Active Return %"
+]
+
+# Every factor score column (MarketObject's plus the 6-month momentum the app offers)
+FACTOR_COLUMNS = AVAILABLE_FACTORS + ['6-Mo Momentum %']
+
+# Text placeholders that mean "no value"
+MISSING_PLACEHOLDERS = ['--', 'N/A', '#N/A', '']
+
+# Columns kept on each MarketObject. Keep Ticker-Region so we can index uniquely when present;
+# include Market Capitalization for cap-weighted portfolios
+MARKET_COLUMNS = ['Ticker-Region', 'Ticker', 'Ending Price', 'Year', '6-Mo Momentum %', 'FactSet Industry', 'Market Capitalization'] + AVAILABLE_FACTORS
+
+# Ticker part of a 'Ticker-Region' label: text before the first '-', surrounding whitespace stripped
+TICKER_REGION_PATTERN = re.compile(r'^\s*([^-]*?)\s*(?:-|$)')
+
+# String columns stored as categoricals after standardization
+CATEGORICAL_COLUMNS = ['FactSet Industry', "Scott's Sector (5)", 'Ticker', 'Ticker-Region']
+
+# Source columns whose invalid rows load_data drops anyway (see _filter_essential_data), so
+# they are filtered server-side: NULL dates, and prices that are NULL or not > 0.
+# Only plain names: PostgREST filter keys can't hold '-' (Ticker-Region)
+_REQUIRED_SOURCE_COLUMNS = ('Date',)
+_POSITIVE_SOURCE_COLUMNS = ('Ending_Price',)
+
+# Columns load_data always keeps: identifiers, dates and what its filters read
+_LOADER_COLUMNS = ('Ticker-Region', 'Ticker', 'Date', 'Year', 'Ending Price', 'FactSet Industry', "Scott's Sector (5)")
+
+# Columns load_data fetches by default: what MarketObject keeps plus the date and filter columns
+DEFAULT_LOAD_COLUMNS = tuple(MARKET_COLUMNS + ['Date', "Scott's Sector (5)"])
 
 ### CREATING FUNCTION TO LOAD DATA ### Tables: FR2000 Annual Quant Data Full Precision Test
-def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full Precision Test', show_loading_progress=True, data_path=None, excel_sheet='Data', sectors=None):
+def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full Precision Test', show_loading_progress=True, data_path=None, excel_sheet='Data', sectors=None, columns=DEFAULT_LOAD_COLUMNS, on_page=None, years=None):
     """
     Load market data from either Supabase or Excel file (fallback).
+
+    Results are cached per (source, table/path, fossil flag, sectors, years) for the
+    life of the process; each call returns its own copy. Use
+    `invalidate_load_cache()` to force a reload. File-like `data_path` inputs
+    (e.g. uploads) and calls with `on_page` are never cached.
     
     Args:
         restrict_fossil_fuels (bool): Whether to exclude fossil fuel companies
         use_supabase (bool): If True, use Supabase; if False, use Excel fallback
         table_name (str): Name of Supabase table containing market data
         show_loading_progress (bool): Whether to show loading progress messages
+        columns (list): Standardized column names to load (default: what MarketObject
+            and the filters use); None loads every column
+        on_page (callable): Optional on_page(rows_loaded, total_estimate, page_df) called
+            after each Supabase page arrives, e.g. to drive a progress bar
+        years (tuple): Optional inclusive (first, last) range of years to load; Supabase
+            filters it server-side
     
     Returns:
         pandas.DataFrame: Market data
     """
+    if columns is not None:
+        # Always keep what the loader itself needs for filtering and cleaning
+        columns = tuple(dict.fromkeys(tuple(columns) + _LOADER_COLUMNS))
+    years = tuple(int(year) for year in years) if years else None
+    if hasattr(data_path, 'read') or on_page is not None:
+        return _load_data_uncached(restrict_fossil_fuels, use_supabase, table_name, show_loading_progress,
+                                   data_path, excel_sheet, sectors, columns, on_page, years)
+
+    sectors_key = tuple(sorted(sectors)) if sectors else None
+    rdata = _load_data_cached(restrict_fossil_fuels, use_supabase, table_name, show_loading_progress,
+                              data_path, excel_sheet, sectors_key, columns, years)
+    if rdata.empty:
+        # Don't hold on to empty results (e.g. a transient connection problem)
+        invalidate_load_cache()
+    return rdata.copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _load_data_cached(restrict_fossil_fuels, use_supabase, table_name, show_loading_progress, data_path, excel_sheet, sectors, columns, years):
+    return _load_data_uncached(restrict_fossil_fuels, use_supabase, table_name, show_loading_progress,
+                               data_path, excel_sheet, list(sectors) if sectors else None, columns, years=years)
+
+
+def invalidate_load_cache():
+    """Clear cached `load_data` results so the next call reloads from the source."""
+    _load_data_cached.cache_clear()
+
+
+def _load_data_uncached(restrict_fossil_fuels=False, use_supabase=True, table_name='Full Precision Test', show_loading_progress=True, data_path=None, excel_sheet='Data', sectors=None, columns=None, on_page=None, years=None):
+    """Load and clean market data without caching; see `load_data`."""
     
     if use_supabase:
         try:
@@ -26,33 +153,29 @@ def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full P
             # Load data from Supabase
             if show_loading_progress:
                 print(f"Using Supabase table: '{effective_table}'")
-            rdata = load_supabase_data(effective_table, show_progress=show_loading_progress, sectors=sectors)
+            rdata = load_supabase_data(effective_table, show_progress=show_loading_progress, sectors=sectors,
+                                       exclude_fossil_fuels=restrict_fossil_fuels,
+                                       columns=_source_columns(columns) if columns is not None else None,
+                                       on_page=on_page, required=_REQUIRED_SOURCE_COLUMNS,
+                                       positive=_POSITIVE_SOURCE_COLUMNS, years=years)
+            server_filters = rdata.attrs.get('server_filters', [])
             
             if rdata.empty:
                 print("Warning: No data loaded from Supabase. Check your table and connection.")
                 return rdata
             
             # Standardize column names to match existing code expectations
-            rdata = _standardize_column_names(rdata)
+            rdata = _select_columns(_standardize_column_names(rdata), columns)
+            # Safety net for the server-side range, and the only year filter for files
+            rdata = _filter_years(rdata, years)
 
             # Apply sector restriction logic (post-standardization)
             if restrict_fossil_fuels:
-                industry_col = 'FactSet Industry'
-                if industry_col in rdata.columns:
-                    before = rdata.copy()
-                    rdata[industry_col] = rdata[industry_col].astype(str).str.lower()
-                    fossil_keywords = ['oil', 'gas', 'coal', 'energy', 'fossil']
-                    mask = rdata[industry_col].apply(lambda x: not any(kw in x for kw in fossil_keywords))
-                    rdata = rdata[mask]
-                    # Report removals (tickers)
-                    if 'Ticker' in before.columns and 'Ticker' in rdata.columns:
-                        removed = sorted(set(before['Ticker']) - set(rdata['Ticker']))
-                        if removed:
-                            print(f"Fossil filter removed {len(removed)} tickers (Supabase): {', '.join(removed[:25])}{' ...' if len(removed) > 25 else ''}")
-                        else:
-                            print("Fossil filter removed 0 tickers (Supabase)")
-                else:
-                    print("Warning: 'FactSet Industry' column not found. Fossil fuel filtering skipped.")
+                if 'fossil' in server_filters:
+                    print("Fossil filter applied server-side (Supabase)")
+                # Client-side pass is a safety net; it only reports when the server missed something
+                rdata = _apply_fossil_filter(rdata, context_label="Supabase",
+                                             report='fossil' not in server_filters)
 
             # If sectors are provided, apply client-side filter as safety-net (in case server-side failed)
             if sectors:
@@ -61,14 +184,14 @@ def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full P
             # Remove duplicate rows and rows with missing essential data (prices/tickers/dates)
             try:
                 before_total = len(rdata)
-                # Drop exact duplicate rows
-                rdata = rdata.drop_duplicates()
+                # Drop duplicate security/date rows
+                rdata = _drop_duplicate_rows(rdata)
                 dup_removed = before_total - len(rdata)
 
                 # Filter out rows missing essential data (uses same logic as for Excel fallback)
-                rdata_before_filter = rdata.copy()
+                before_filter = len(rdata)
                 rdata = _filter_essential_data(rdata)
-                nulls_removed = len(rdata_before_filter) - len(rdata)
+                nulls_removed = before_filter - len(rdata)
 
                 if dup_removed > 0 or nulls_removed > 0:
                     print(f"Supabase load: removed {dup_removed} duplicate rows and {nulls_removed} rows with missing essential data (out of {before_total} rows).")
@@ -127,41 +250,24 @@ def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full P
                 if file_name.lower().endswith('.csv'):
                     rdata = pd.read_csv(data_path)
                 else:
-                    rdata = pd.read_excel(data_path, sheet_name=excel_sheet, header=2, skiprows=[3, 4])
+                    rdata = _read_excel(data_path, excel_sheet)
             else:
                 # Handle string paths
                 print(f"Loading data file from: {data_path}")
-                lp = str(data_path).lower()
-                if lp.endswith('.csv'):
-                    rdata = pd.read_csv(data_path)
-                else:
-                    rdata = pd.read_excel(data_path, sheet_name=excel_sheet, header=2, skiprows=[3, 4])
+                rdata = _read_data_file(str(data_path), excel_sheet,
+                                        columns=_source_columns(columns) if columns is not None else None)
 
-            # Normalize column names and remove duplicate columns
-            rdata.columns = rdata.columns.str.strip()
-            rdata = rdata.loc[:, ~rdata.columns.duplicated(keep='first')]
+            # Normalize column names and remove duplicate columns (a no-op for already clean labels)
+            rdata = clean_column_labels(rdata)
 
             # Standardize to the same column names we expect from Supabase
-            rdata = _standardize_column_names(rdata)
+            rdata = _select_columns(_standardize_column_names(rdata), columns)
+            # Safety net for the server-side range, and the only year filter for files
+            rdata = _filter_years(rdata, years)
 
             # Apply sector restriction logic (post-standardization)
             if restrict_fossil_fuels:
-                industry_col = 'FactSet Industry'
-                if industry_col in rdata.columns:
-                    before = rdata.copy()
-                    rdata[industry_col] = rdata[industry_col].astype(str).str.lower()
-                    fossil_keywords = ['oil', 'gas', 'coal', 'energy', 'fossil']
-                    mask = rdata[industry_col].apply(lambda x: not any(kw in x for kw in fossil_keywords))
-                    rdata = rdata[mask]
-                    # Report removals (tickers)
-                    if 'Ticker' in before.columns and 'Ticker' in rdata.columns:
-                        removed = sorted(set(before['Ticker']) - set(rdata['Ticker']))
-                        if removed:
-                            print(f"Fossil filter removed {len(removed)} tickers (Excel/CSV): {', '.join(removed[:25])}{' ...' if len(removed) > 25 else ''}")
-                        else:
-                            print("Fossil filter removed 0 tickers (Excel/CSV)")
-                else:
-                    print("Warning: 'FactSet Industry' column not found. Fossil fuel filtering skipped.")
+                rdata = _apply_fossil_filter(rdata, context_label="Excel/CSV")
 
             # If sectors are provided, apply client-side filter
             if sectors:
@@ -170,14 +276,14 @@ def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full P
             # Remove duplicate rows and rows with missing essential data (prices/tickers/dates)
             try:
                 before_total = len(rdata)
-                # Drop exact duplicate rows
-                rdata = rdata.drop_duplicates()
+                # Drop duplicate security/date rows
+                rdata = _drop_duplicate_rows(rdata)
                 dup_removed = before_total - len(rdata)
 
                 # Filter out rows missing essential data
-                rdata_before_filter = rdata.copy()
+                before_filter = len(rdata)
                 rdata = _filter_essential_data(rdata)
-                nulls_removed = len(rdata_before_filter) - len(rdata)
+                nulls_removed = before_filter - len(rdata)
 
                 if dup_removed > 0 or nulls_removed > 0:
                     print(f"File load: removed {dup_removed} duplicate rows and {nulls_removed} rows with missing essential data (out of {before_total} rows).")
@@ -199,78 +305,198 @@ def load_data(restrict_fossil_fuels=False, use_supabase=True, table_name='Full P
             raise
 
 
+def _parquet_sidecar_path(data_path, excel_sheet):
+    """Parquet copy of a CSV/Excel source, stored next to it (one per Excel sheet)."""
+    path = Path(data_path)
+    if path.suffix.lower() == '.csv':
+        return path.with_suffix('.parquet')
+    return path.with_name(f"{path.stem}.{excel_sheet}.parquet")
+
+
+def _read_parquet_columns(path, columns=None):
+    """Read a parquet file, limited to those of `columns` it actually has."""
+    if columns is not None:
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+    return pd.read_parquet(path, columns=columns)
+
+
+def _excel_engine():
+    """Fastest installed Excel reader: calamine (Rust) if present, else pandas' default."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return 'calamine'
+
+
+def _read_excel(data_path, excel_sheet='Data'):
+    """Read the data sheet of an Excel export (header on row 3, the two rows below it skipped)."""
+    return pd.read_excel(data_path, sheet_name=excel_sheet, header=2, skiprows=[3, 4],
+                         engine=_excel_engine())
+
+
+def _read_data_file(data_path, excel_sheet='Data', columns=None):
+    """
+    Read a CSV/Excel/parquet file path into a DataFrame.
+
+    CSV and Excel sources are cached as a parquet sidecar after the first read
+    and served from it while it is newer than the source. Sidecars are skipped
+    silently if parquet support (pyarrow) is unavailable or the file can't be written.
+    `columns` (raw source names) limits what is read from parquet.
+    """
+    lp = data_path.lower()
+    if lp.endswith('.parquet'):
+        return _read_parquet_columns(data_path, columns)
+
+    sidecar = _parquet_sidecar_path(data_path, excel_sheet)
+    try:
+        if sidecar.exists() and sidecar.stat().st_mtime >= os.path.getmtime(data_path):
+            return _read_parquet_columns(sidecar, columns)
+    except Exception:
+        pass
+
+    if lp.endswith('.csv'):
+        rdata = pd.read_csv(data_path)
+    else:
+        rdata = _read_excel(data_path, excel_sheet)
+
+    try:
+        rdata.to_parquet(sidecar, compression='zstd')
+    except Exception:
+        # Non-fatal: mixed-type columns or a read-only location just skip the sidecar
+        try:
+            sidecar.unlink()
+        except OSError:
+            pass
+    return rdata
+
+
+def _source_columns(columns):
+    """Raw source (Supabase/CSV) column names that standardize to `columns`."""
+    names = []
+    for col in columns:
+        names.extend([_SOURCE_COLUMN_NAMES.get(col, col), col])
+    # Lowercase fallbacks that _standardize_column_names derives Ticker/Year from
+    names.extend(['ticker_region', 'date'])
+    return list(dict.fromkeys(names))
+
+
+def _select_columns(df, columns):
+    """Keep only `columns` (standardized names) that are present, in frame order."""
+    if columns is None:
+        return df
+    wanted = set(columns)
+    return df[[col for col in df.columns if col in wanted]]
+
+
+def ticker_from_region(ticker_region: pd.Series) -> pd.Series:
+    """
+    Ticker part of 'Ticker-Region' labels (text before the first '-', stripped). Labels repeat
+    every year, so each distinct label is parsed once and the result mapped back by code.
+    """
+    codes, labels = pd.factorize(ticker_region)
+    tickers = pd.Series(labels).str.extract(TICKER_REGION_PATTERN, expand=False)
+    return pd.Series(pd.api.extensions.take(tickers.values, codes, allow_fill=True),
+                     index=ticker_region.index, name=ticker_region.name)
+
+
+def year_from_dates(dates: pd.Series) -> pd.Series:
+    """Calendar year of each date; ISO-8601 strings take the fixed-format parser, others fall back to inference."""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        try:
+            dates = pd.to_datetime(dates, format='ISO8601', cache=True)
+        except (ValueError, TypeError):
+            dates = pd.to_datetime(dates, cache=True)
+    return dates.dt.year
+
+
 def _standardize_column_names(df):
     """
     Hardcoded column name mapping from Supabase format to factor code expectations.
     This maps the EXACT column names from Supabase to what the factor functions expect.
     """
-    # HARDCODED mapping - Supabase column names -> Expected column names
-    column_mapping = {
-        # Core columns
-        'ID': 'ID',
-        'Security_Name': 'Security Name',
-        'Ticker-Region': 'Ticker-Region',
-        'Russell_2000_Port_Weight': 'Russell 2000 Port. Weight',
-        'Ending_Price': 'Ending Price',
-        'Market_Capitalization': 'Market Capitalization',
-        'Date': 'Date',
-        'FactSet_Industry': 'FactSet Industry',
-        'Scotts_Sector_5': "Scott's Sector (5)",
-
-        # Factor columns - EXACT mapping from Supabase
-        'ROE_using_9-30_Data': 'ROE using 9/30 Data',
-        'ROA_using_9-30_Data': 'ROA using 9/30 Data',
-        'Price_to_Book_Using_9-30_Data': 'Price to Book Using 9/30 Data',
-        'Next_FY_Earns-P': 'Next FY Earns/P',
-        '12-Mo_Momentum': '12-Mo Momentum %',
-        '6-Mo_Momentum': '6-Mo Momentum %',
-        '1-Mo_Momentum': '1-Mo Momentum %',
-        '1-Yr_Price_Vol': '1-Yr Price Vol %',
-        'Accruals-Assets': 'Accruals/Assets',
-        'ROA': 'ROA %',
-        '1-Yr_Asset_Growth': '1-Yr Asset Growth %',
-        '1-Yr_CapEX_Growth': '1-Yr CapEX Growth %',
-        'Book-Price': 'Book/Price',
-        'Next-Years_Return': "Next-Year's Return %",
-        'Next-Years_Active_Return': "Next-Year's Active Return %",
-
-        # Financial data columns
-        'NI_Millions': 'NI, $Millions',
-        'OpCF_Millions': 'OpCF, $Millions',
-        'Latest_Assets_Millions': 'Latest Assets, $Millions',
-        'Prior_Years_Assets_Millions': "Prior Year's Assets, $Millions",
-        'Book_Value_Per_Share': 'Book Value Per Share $',
-        'CapEx_Millions': 'CapEx, $Millions',
-        'Prior_Years_CapEx_Millions': "Prior Year's CapEx, $Millions",
-        'Earnings_Surprise': 'Earnings Surprise %',
-        'EarningsReportedLast': 'Earnings Reported Last',
-        'Avg_Daily_3-Mo_Volume_Mills': 'Avg Daily 3-Mo Volume Mills $',
-    }
-
-    # Apply column name mapping
-    df = df.rename(columns=column_mapping)
+    # Apply column name mapping, skipping the rename when the source already uses canonical names
+    needed = {src: dst for src, dst in COLUMN_MAPPING.items() if src != dst and src in df.columns}
+    if needed:
+        df = df.rename(columns=needed)
     
     # Ensure required columns exist (with fallback logic)
     if 'Ticker' not in df.columns:
         if 'Ticker-Region' in df.columns:
-            df['Ticker'] = df['Ticker-Region'].str.split('-').str[0].str.strip()
+            df['Ticker'] = ticker_from_region(df['Ticker-Region'])
         elif 'ticker_region' in df.columns:
-            df['Ticker'] = df['ticker_region'].str.split('-').str[0].str.strip()
+            df['Ticker'] = ticker_from_region(df['ticker_region'])
     
     if 'Year' not in df.columns:
         if 'Date' in df.columns:
-            df['Year'] = pd.to_datetime(df['Date']).dt.year
+            df['Year'] = year_from_dates(df['Date'])
         elif 'date' in df.columns:
-            df['Year'] = pd.to_datetime(df['date']).dt.year
+            df['Year'] = year_from_dates(df['date'])
     
     # Ensure Ticker-Region exists if we have ticker_region in lowercase
     if 'Ticker-Region' not in df.columns and 'ticker_region' in df.columns:
         df['Ticker-Region'] = df['ticker_region']
+
+    # Low-cardinality labels repeat every year; store them as categoricals
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and (df[col].dtype == object or pd.api.types.is_string_dtype(df[col])):
+            df[col] = df[col].astype('category')
+
+    # Factor scores only feed rankings, so float32 is plenty and halves their footprint.
+    # Prices and market caps stay float64 for valuation; text columns are coerced by MarketObject.
+    factor_cols = [col for col in FACTOR_COLUMNS if col in df.columns and df[col].dtype == np.float64]
+    if factor_cols:
+        df[factor_cols] = df[factor_cols].astype(np.float32)
     
     return df
 
 
 
+FOSSIL_PATTERN = '|'.join(FOSSIL_KEYWORDS)
+FOSSIL_RE = re.compile(FOSSIL_PATTERN, re.IGNORECASE)
+
+
+def _fossil_free_mask(industry: pd.Series) -> pd.Series:
+    """Boolean mask that is True where an industry label matches no fossil-fuel keyword."""
+    # Match the few distinct labels once instead of every row (standardized frames are
+    # already categorical; anything else is encoded first, which is a cheap hash pass)
+    if not isinstance(industry.dtype, pd.CategoricalDtype):
+        industry = industry.astype('category')
+    labels = industry.cat.categories
+    fossil_labels = labels[labels.astype(str).str.contains(FOSSIL_RE, na=False)]
+    return ~industry.isin(fossil_labels)
+
+
+def _apply_fossil_filter(df: pd.DataFrame, context_label: str = "", report: bool = True) -> pd.DataFrame:
+    """
+    Drop fossil-fuel companies (by 'FactSet Industry') and report removed tickers.
+
+    Args:
+        df: DataFrame after column standardization
+        context_label: short label for logging context (e.g., "Supabase" or "Excel/CSV")
+        report: if False, only report when something was actually removed
+
+    Returns:
+        Filtered DataFrame
+    """
+    industry_col = 'FactSet Industry'
+    if industry_col not in df.columns:
+        print("Warning: 'FactSet Industry' column not found. Fossil fuel filtering skipped.")
+        return df
+    before_tickers = df['Ticker'].to_numpy() if 'Ticker' in df.columns else None
+    df = df.loc[_fossil_free_mask(df[industry_col])]
+    # Report removals (tickers)
+    if before_tickers is not None:
+        removed = sorted(set(before_tickers) - set(df['Ticker']))
+        if removed:
+            print(f"Fossil filter removed {len(removed)} tickers ({context_label}): {', '.join(removed[:25])}{' ...' if len(removed) > 25 else ''}")
+        elif report:
+            print(f"Fossil filter removed 0 tickers ({context_label})")
+    return df
+
+
 def _apply_sector_filter(df: pd.DataFrame, sectors, context_label: str = "") -> pd.DataFrame:
     """
     Filter a DataFrame to only include selected sectors.
@@ -290,11 +516,30 @@ def _apply_sector_filter(df: pd.DataFrame, sectors, context_label: str = "") ->
         print(f"Warning: '{col}' column not found. Sector filtering skipped ({context_label}).")
         return df
     before = len(df)
-    filtered = df[df[col].isin(sectors)].copy()
+    filtered = df[df[col].isin(sectors)]
     removed = before - len(filtered)
     print(f"Sector filter kept {len(filtered)} rows and removed {removed} ({context_label}).")
     return filtered
 
+def _drop_duplicate_rows(df):
+    """
+    Drop repeated rows for the same security and date, keeping the first.
+
+    Only the identifying columns are hashed (Ticker-Region/Date, else
+    Ticker/Year); falls back to whole-row comparison when neither pair exists.
+    """
+    for subset in (['Ticker-Region', 'Date'], ['Ticker', 'Year']):
+        if all(col in df.columns for col in subset):
+            return df.drop_duplicates(subset=subset, keep='first')
+    return df.drop_duplicates()
+
+def _filter_years(df, years):
+    """Rows whose Year lies in the inclusive (first, last) range; unchanged if `years` is None."""
+    if not years or 'Year' not in df.columns:
+        return df
+    first, last = years
+    return df.loc[df['Year'].between(first, last).to_numpy()]
+
 def _filter_essential_data(df):
     """
     Filter out rows with missing essential data like pricing information.
@@ -303,6 +548,7 @@ def _filter_essential_data(df):
         return df
         
     initial_count = len(df)
+    keep = np.ones(initial_count, dtype=bool)
     
     # Remove rows where Ending Price is missing or invalid
     price_col = None
@@ -312,20 +558,25 @@ def _filter_essential_data(df):
         price_col = 'Ending_Price'
     if price_col:
         # Coerce to numeric in case values are strings
-        df[price_col] = pd.to_numeric(df[price_col], errors='coerce')
-        df = df[df[price_col].notna() & (df[price_col] > 0)]
+        prices = pd.to_numeric(df[price_col], errors='coerce')
+        price_values = prices.to_numpy(dtype=float, na_value=np.nan)
+        keep &= np.isfinite(price_values) & (price_values > 0)
     
     # Remove rows where Ticker is missing
-    if 'Ticker' in df.columns:
-        df = df[df['Ticker'].notna() & (df['Ticker'] != '') & (df['Ticker'] != '--')]
-    elif 'Ticker-Region' in df.columns:
-        df = df[df['Ticker-Region'].notna() & (df['Ticker-Region'] != '') & (df['Ticker-Region'] != '--')]
+    ticker_col = 'Ticker' if 'Ticker' in df.columns else ('Ticker-Region' if 'Ticker-Region' in df.columns else None)
+    if ticker_col:
+        tickers = df[ticker_col]
+        keep &= (tickers.notna() & (tickers != '') & (tickers != '--')).to_numpy()
     
     # Remove rows where Date/Year is missing
     if 'Year' in df.columns:
-        df = df[df['Year'].notna()]
+        keep &= df['Year'].notna().to_numpy()
     elif 'Date' in df.columns:
-        df = df[df['Date'].notna()]
+        keep &= df['Date'].notna().to_numpy()
+
+    df = df.loc[keep]
+    if price_col and not pd.api.types.is_numeric_dtype(df[price_col]):
+        df = df.assign(**{price_col: prices[keep]})
     
     filtered_count = len(df)
     removed_count = initial_count - filtered_count
@@ -340,48 +591,75 @@ def _filter_essential_data(df):
 """
 Note: A duplicate Supabase loading implementation existed below which directly
 queried a hard-coded table and bypassed the standardized column mapping. It has
-been removed to ensure a single, robust data-loading path via SupabaseDataClient
-above. The supported entry point is load_data(restrict_fossil_fuels=False,
+been removed to ensure a single, robust data-loading path via load_supabase_data
+(src/supabase_client.py). The supported entry point is load_data(restrict_fossil_fuels=False,
 use_supabase=True, table_name='All').
 """
 
+# Column label sequences already known to be stripped and unique
+_CLEAN_LABELS = set()
+
+
+def clean_column_labels(df):
+    """Strip whitespace from column labels and drop repeated columns, keeping the first."""
+    labels = tuple(df.columns)
+    if labels in _CLEAN_LABELS:
+        return df
+    stripped = df.columns.str.strip()
+    if stripped.equals(df.columns) and not df.columns.duplicated().any():
+        _CLEAN_LABELS.add(labels)
+        return df
+    df = df.set_axis(stripped, axis=1)
+    return df.loc[:, ~df.columns.duplicated(keep='first')]
+
+
+class MarketArrays(NamedTuple):
+    """Plain numpy view of a market for array kernels; rows of `prices` and `factor_matrix` line up."""
+    index_map: Dict[str, int]
+    prices: np.ndarray
+    factor_matrix: np.ndarray
+    factor_names: Tuple[str, ...]
+
+
 class MarketObject():
-    def __init__(self, data, t, verbosity=1):
+    def __init__(self, data, t, verbosity=1, trusted=False):
         """
         data(DataFrame): Market data with columns like 'Ticker', 'Ending Price', etc.
         t (int): Year of market data.
         verbosity (int): Controls level of printed output. 0 = silent, 1 = normal, 2+ = verbose.
+        trusted (bool): Column labels were already cleaned by clean_column_labels(); skip that pass.
         """
-        # Remove duplicated column names
-        data.columns = data.columns.str.strip()
-        data = data.loc[:, ~data.columns.duplicated(keep='first')]
+        if not trusted:
+            data = clean_column_labels(data)
 
-        # Ensure 'Ticker' and 'Year' columns are present
+        # Ensure 'Ticker' and 'Year' columns are present (added on a new frame, not the caller's)
+        derived = {}
         if 'Ticker' not in data.columns and 'Ticker-Region' in data.columns:
-            data['Ticker'] = data['Ticker-Region'].str.split('-').str[0].str.strip()
+            derived['Ticker'] = ticker_from_region(data['Ticker-Region'])
         if 'Year' not in data.columns and 'Date' in data.columns:
-            data['Year'] = pd.to_datetime(data['Date']).dt.year
-
-        # Define relevant columns
-        available_factors = [
-            'ROE using 9/30 Data', 'ROA using 9/30 Data', '12-Mo Momentum %', '1-Mo Momentum %',
-            'Price to Book Using 9/30 Data', 'Next FY Earns/P', '1-Yr Price Vol %', 'Accruals/Assets',
-            'ROA %', '1-Yr Asset Growth %', '1-Yr CapEX Growth %', 'Book/Price',
-            "Next-Year's Return %", "Next-Year's Active Return %"
-        ]
-        # Keep Ticker-Region so we can index uniquely when present
-        # Include Market Capitalization for cap-weighted portfolios
-        keep_cols = ['Ticker-Region', 'Ticker', 'Ending Price', 'Year', '6-Mo Momentum %', 'FactSet Industry', 'Market Capitalization'] + available_factors
+            derived['Year'] = year_from_dates(data['Date'])
+        if derived:
+            data = data.assign(**derived)
 
         # Filter and clean data
-        data = data[[col for col in keep_cols if col in data.columns]].copy()
-        data.replace({'--': None, 'N/A': None, '#N/A': None, '': None}, inplace=True)
+        # Shallow copy of the column subset: the writes below replace whole columns, so the caller's
+        # frame is left alone, and pandas < 3 doesn't treat them as chained assignment
+        data = data[[col for col in MARKET_COLUMNS if col in data.columns]].copy(deep=False)
+        # Placeholders only occur in text columns; skip numeric ones and write back only if something matched
+        text_cols = [col for col in data.columns
+                     if not (pd.api.types.is_numeric_dtype(data[col]) or pd.api.types.is_datetime64_any_dtype(data[col]))]
+        if text_cols:
+            placeholders = data[text_cols].isin(MISSING_PLACEHOLDERS)
+            if placeholders.to_numpy().any():
+                data[text_cols] = data[text_cols].mask(placeholders)
         
         # Convert numeric columns to proper numeric types
-        numeric_columns = ['Ending Price', 'Market Capitalization'] + [col for col in available_factors if col in data.columns]
-        for col in numeric_columns:
-            if col in data.columns:
-                data[col] = pd.to_numeric(data[col], errors='coerce')
+        numeric_columns = ['Ending Price', 'Market Capitalization'] + [col for col in AVAILABLE_FACTORS if col in data.columns]
+        # Coerce as one block; columns that are already numeric (e.g. from parquet) are left alone
+        to_convert = [col for col in numeric_columns
+                      if col in data.columns and not pd.api.types.is_numeric_dtype(data[col])]
+        if to_convert:
+            data[to_convert] = data[to_convert].apply(pd.to_numeric, errors='coerce')
 
         # Prefer 'Ticker' index for compatibility with 'main'; fallback to 'Ticker-Region'
         index_col = 'Ticker' if 'Ticker' in data.columns else ('Ticker-Region' if 'Ticker-Region' in data.columns else None)
@@ -394,24 +672,128 @@ class MarketObject():
         self.stocks = data
         self.t = t
         self.verbosity = verbosity
+        self._price_frame = None
+        self._price_col = None
+        self._valid_prices = None
+        self._price_map = {}
+        self._eligible_frame = None
+        self._eligible_stocks = None
+        self._cols_frame = None
+        self._row_of = {}
+        self._cols = {}
+        self._arrays_frame = None
+        self._arrays = None
+
+    def _column_arrays(self):
+        """
+        Column-wise view of `stocks`: ticker -> row position (first row per ticker)
+        and column name -> numpy array. Built on first use and rebuilt whenever
+        `stocks` has been replaced.
+        """
+        if self._cols_frame is not self.stocks:
+            row_of = {}
+            for i, ticker in enumerate(self.stocks.index):
+                row_of.setdefault(ticker, i)
+            self._row_of = row_of
+            self._cols = {col: self.stocks[col].to_numpy() for col in self.stocks.columns}
+            self._cols_frame = self.stocks
+        return self._row_of, self._cols
+
+    def get(self, ticker, col):
+        """Value of `col` for `ticker` (first row if repeated), or None if either is missing."""
+        row_of, cols = self._column_arrays()
+        i = row_of.get(ticker)
+        values = cols.get(col)
+        if i is None or values is None:
+            return None
+        return values[i]
+
+    def as_arrays(self):
+        """
+        MarketArrays bundle: ticker -> row (first row per ticker), float64 prices
+        (NaN where missing or <= 0) and a C-contiguous float64 (rows x factors)
+        matrix of the AVAILABLE_FACTORS present. Cached per `stocks` frame.
+        """
+        if self._arrays_frame is not self.stocks:
+            row_of, _ = self._column_arrays()
+            price_col = next((col for col in ['Ending Price', 'Ending_Price'] if col in self.stocks.columns), None)
+            if price_col is None:
+                prices = np.full(len(self.stocks), np.nan)
+            else:
+                prices = pd.to_numeric(self.stocks[price_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                prices = np.where(prices > 0, prices, np.nan)
+            factor_names = tuple(col for col in AVAILABLE_FACTORS if col in self.stocks.columns)
+            factors = self.stocks[list(factor_names)].apply(pd.to_numeric, errors='coerce')
+            matrix = np.ascontiguousarray(factors.to_numpy(dtype=np.float64, na_value=np.nan))
+            self._arrays = MarketArrays(row_of, prices, matrix, factor_names)
+            self._arrays_frame = self.stocks
+        return self._arrays
 
     def get_price(self, ticker):
-        # Try both 'Ending Price' and 'Ending_Price' for compatibility
-        for price_col in ['Ending Price', 'Ending_Price']:
+        # Plain dict lookup of the first valid price; pandas is only touched for diagnostics
+        self._price_table()
+        price = self._price_map.get(ticker)
+        if price is None and self.verbosity >= 2:
+            if ticker in self.stocks.index:
+                raw = self.stocks.loc[ticker, self._price_col] if self._price_col else None
+                if isinstance(raw, pd.Series):
+                    raw = raw.iloc[0] if len(raw) > 0 else None
+                print(f"{ticker} - invalid price ({raw}) for {self.t} - SKIPPING")
+            else:
+                print(f"{ticker} - not found in market data for {self.t} - SKIPPING")
+        return price
+
+    def eligible_stocks(self, restrict_fossil_fuels=False):
+        """
+        Stocks eligible for selection.
+
+        With restrict_fossil_fuels=True, fossil-fuel industries are dropped. The
+        filtered frame is built once per market and reused; `self.stocks` is
+        left untouched.
+        """
+        industry_col = 'FactSet Industry'
+        if not restrict_fossil_fuels or industry_col not in self.stocks.columns:
+            return self.stocks
+        if self._eligible_frame is not self.stocks:
+            mask = _fossil_free_mask(self.stocks[industry_col])
+            # Report which tickers are being removed in this step
             try:
-                price = self.stocks.loc[ticker, price_col]
-                if isinstance(price, (pd.Series, np.ndarray)):
-                    if hasattr(price, 'dropna') and not price.dropna().empty:
-                        price = price.dropna().iloc[0]
-                    else:
-                        price = price.iloc[0] if hasattr(price, 'iloc') and len(price) > 0 else None
-                if pd.isna(price) or price is None or price <= 0:
-                    if self.verbosity >= 2:
-                        print(f"{ticker} - invalid price ({price}) for {self.t} - SKIPPING")
-                    return None
-                return price
-            except KeyError:
-                continue
-        if self.verbosity >= 2:
-            print(f"{ticker} - not found in market data for {self.t} - SKIPPING")
-        return None
+                removed_tickers = list(self.stocks.loc[~mask].index)
+                if removed_tickers:
+                    print(f"Fossil filter (holdings) removed {len(removed_tickers)} tickers: {', '.join(removed_tickers[:25])}{' ...' if len(removed_tickers) > 25 else ''}")
+            except Exception:
+                pass
+            self._eligible_stocks = self.stocks[mask]
+            self._eligible_frame = self.stocks
+        return self._eligible_stocks
+
+    def _price_table(self):
+        """
+        Valid price per ticker (first non-null row; NaN if missing or <= 0), plus
+        the same prices as a dict for scalar lookups. Rebuilt whenever `stocks`
+        has been replaced.
+        """
+        if self._price_frame is not self.stocks:
+            # Try both 'Ending Price' and 'Ending_Price' for compatibility
+            self._price_col = next((col for col in ['Ending Price', 'Ending_Price'] if col in self.stocks.columns), None)
+            if self._price_col is None:
+                prices = pd.Series(dtype=float)
+            else:
+                prices = pd.to_numeric(self.stocks[self._price_col], errors='coerce')
+                prices = prices.groupby(level=0, sort=False, observed=True).first()
+                prices = prices.where(prices > 0)
+                prices.index = prices.index.astype(object)
+            self._valid_prices = prices
+            self._price_map = prices.dropna().to_dict()
+            self._price_frame = self.stocks
+        return self._valid_prices
+
+    def get_prices(self, tickers):
+        """
+        Vectorized counterpart of `get_price`.
+
+        Returns a float array aligned with `tickers`; entries are NaN wherever
+        `get_price` would return None (missing ticker or non-positive price).
+        """
+        self._price_table()
+        return self._valid_prices.reindex(pd.Index(tickers, dtype=object)).to_numpy(dtype=float)
@@ -1,31 +1,73 @@
+import numpy as np
+
+
 class Portfolio:
     ### Initialize portfolio by providing a name and a list of investments ###
     def __init__(self, name, investments=None):
         self.name = name
-        if investments is not None:
-            self.investments = investments
-        else:
-            self.investments = []
+        self.investments = investments if investments is not None else []
+
+    ### Investments as a list of {'ticker', 'number_of_shares'} dicts ###
+    # Valuation reads (tickers, shares) numpy arrays built from this list on first use
+    # and cached; the mutators below (and assigning a new list) clear that cache.
+    # After editing the list in place, call finalize() to rebuild the arrays.
+    @property
+    def investments(self):
+        return self._investments
+
+    @investments.setter
+    def investments(self, investments):
+        self._investments = investments
+        self._arrays = None
 
     ### Add a stock to the portfolio ###
     def add_investment(self, ticker, nShares):
         investment = {'ticker': ticker, 'number_of_shares': nShares}
-        self.investments.append(investment)
+        self._investments.append(investment)
+        self._arrays = None
+
+    ### Add several stocks at once from parallel ticker/share sequences ###
+    def add_investments_bulk(self, tickers, shares):
+        tickers = np.asarray(tickers, dtype=object)
+        shares = np.asarray(shares, dtype=float)
+        was_empty = not self._investments
+        self._investments.extend(
+            {'ticker': ticker, 'number_of_shares': n}
+            for ticker, n in zip(tickers.tolist(), shares.tolist())
+        )
+        # A fresh portfolio's arrays are exactly the ones just added
+        self._arrays = (tickers.copy(), shares.copy()) if was_empty else None
+
+    ### Build (tickers, shares) numpy arrays from the current holdings ###
+    def finalize(self):
+        tickers = np.array([inv['ticker'] for inv in self._investments], dtype=object)
+        shares = np.array([inv['number_of_shares'] for inv in self._investments], dtype=float)
+        self._arrays = (tickers, shares)
+        return self
+
+    ### Return (tickers, shares) as numpy arrays ###
+    def as_arrays(self):
+        if self._arrays is None:
+            self.finalize()
+        return self._arrays
 
     ### Remove a stock from the portfolio ###
     def remove_investment(self, ticker):
         self.investments = [
-            inv for inv in self.investments if inv['ticker'] != ticker
+            inv for inv in self._investments if inv['ticker'] != ticker
         ]
 
     ### Calculate portfolio value ###
     def present_value(self, market):
-        total_value = 0
-        for inv in self.investments:
-            price = market.get_price(inv['ticker'])
-            if price is not None:
-                total_value += price * inv['number_of_shares']
-        return total_value
+        tickers, shares = self.as_arrays()
+        if len(tickers) == 0:
+            return 0.0
+        if hasattr(market, 'get_prices'):
+            prices = market.get_prices(tickers)
+        else:
+            # Markets that only offer per-ticker get_price (None when missing)
+            prices = np.array([market.get_price(ticker) for ticker in tickers], dtype=float)
+        return float(np.nansum(prices * shares))
 
     ### Calculate return for the portfolio ###
     def calculate_return(self, t1_value, t2_value):
@@ -33,4 +75,3 @@ class Portfolio:
             return (t2_value - t1_value) / t1_value * 100
         else:
             raise ValueError('Value at time 1 is 0')
-
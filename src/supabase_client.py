@@ -1,16 +1,186 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-from supabase import create_client, Client
 
-def load_supabase_data(table_name='Full Precision Test', show_progress=True, sectors=None):
+# Industry keywords (case-insensitive substrings) that mark fossil-fuel companies
+FOSSIL_KEYWORDS = ('oil', 'gas', 'coal', 'energy', 'fossil')
+
+# Integer year columns a table may have, tried in order before falling back to a Date range
+YEAR_COLUMNS = ('Year', 'year')
+
+# Rows per request (PostgREST's default max-rows)
+PAGE_SIZE = 1000
+
+# Pages requested concurrently after the first; keep modest to stay under API rate limits
+PAGE_FETCH_WORKERS = 4
+
+# Cached pulls are trusted this long when the table has no updated_at column to compare
+CACHE_MAX_AGE = 24 * 3600
+
+# (project URL, API key) -> Supabase client
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# (project URL, table name) -> column names; schema changes rarely, so probe once per process
+_TABLE_COLUMNS = {}
+
+
+def _table_columns(supabase, table_name):
+    """Column names of `table_name`, from a one-row probe cached per project/table; None if unknown."""
+    key = (getattr(supabase, 'supabase_url', None), table_name)
+    if key not in _TABLE_COLUMNS:
+        try:
+            sample = supabase.table(table_name).select('*').limit(1).execute().data
+        except Exception:
+            return None
+        if not sample:
+            return None
+        _TABLE_COLUMNS[key] = frozenset(sample[0])
+    return _TABLE_COLUMNS[key]
+
+
+def _select_clause(supabase, table_name, columns):
     """
-    Loads data from a Supabase table and returns it as a pandas DataFrame.
-    Credentials are read from environment variables or Colab userdata.
-    Uses pagination to load all records.
-    
-    Args:
-        table_name (str): Name of the Supabase table to load
-        show_progress (bool): Whether to print loading progress messages
+    PostgREST select list for `columns`, limited to columns the table has.
+
+    Uses the cached schema probe; falls back to '*' if that fails or nothing matches.
+    """
+    if not columns:
+        return '*'
+    table_columns = _table_columns(supabase, table_name)
+    if table_columns is None:
+        return '*'
+    present = [col for col in columns if col in table_columns]
+    if not present:
+        return '*'
+    # Quote names: many contain '-' or spaces
+    return ','.join(f'"{col}"' for col in present)
+
+
+class _FastJSONAdapter:
+    """
+    Stand-in for postgrest's pydantic JSON adapter, which is several times slower than a plain
+    JSON parser on large pages. Anything the fast parser rejects goes to the original adapter,
+    so postgrest still sees the ValidationError it handles.
+    """
+    def __init__(self, adapter, loads):
+        self._adapter = adapter
+        self._loads = loads
+
+    def validate_json(self, content):
+        try:
+            return self._loads(content)
+        except ValueError:
+            return self._adapter.validate_json(content)
+
+    def __getattr__(self, name):
+        return getattr(self._adapter, name)
+
+
+def _use_fast_json():
+    """Decode PostgREST responses with orjson (or the stdlib json module) instead of pydantic."""
+    try:
+        from postgrest import base_request_builder
+    except ImportError:
+        return
+    if isinstance(getattr(base_request_builder, 'JSONAdapter', None), (_FastJSONAdapter, type(None))):
+        return
+    try:
+        import orjson
+        loads = orjson.loads
+    except ImportError:
+        loads = json.loads
+    base_request_builder.JSONAdapter = _FastJSONAdapter(base_request_builder.JSONAdapter, loads)
+
+
+def _page_frame(batch):
+    """
+    Columnar form of one page of row dicts: a pyarrow Table when pyarrow is available
+    (faster to build and to concatenate), else a DataFrame.
+    """
+    try:
+        import pyarrow as pa
+        return pa.Table.from_pylist(batch)
+    except Exception:
+        # No pyarrow, or values it can't type (e.g. mixed numbers and text in a column)
+        return pd.DataFrame(batch)
+
+
+def _as_frame(page):
+    return page if isinstance(page, pd.DataFrame) else page.to_pandas()
+
+
+def _concat_pages(pages):
+    """One DataFrame from the pages made by _page_frame, with plain NumPy-backed dtypes."""
+    if not pages:
+        return pd.DataFrame()
+    if not any(isinstance(page, pd.DataFrame) for page in pages):
+        import pyarrow as pa
+        try:
+            # 'permissive' unifies pages whose column was all-NULL or integral in one page
+            return pa.concat_tables(pages, promote_options='permissive').to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return pd.concat([_as_frame(page) for page in pages], ignore_index=True)
+
+
+def _table_stamp(supabase, table_name):
+    """Latest `updated_at` in the table, or None if it has no such column or the query fails."""
+    table_columns = _table_columns(supabase, table_name)
+    if not table_columns or 'updated_at' not in table_columns:
+        return None
+    try:
+        rows = supabase.table(table_name).select('updated_at').order('updated_at', desc=True).limit(1).execute().data
+    except Exception:
+        return None
+    return rows[0]['updated_at'] if rows else None
+
+
+def _read_cached_pull(path, stamp):
+    """Cached frame at `path` if still valid for `stamp`, else None."""
+    meta_path = path.with_suffix('.json')
+    try:
+        meta = json.loads(meta_path.read_text())
+        if stamp is not None:
+            fresh = meta.get('stamp') == stamp
+        else:
+            fresh = time.time() - meta_path.stat().st_mtime < CACHE_MAX_AGE
+        if not fresh:
+            return None
+        df = pd.read_parquet(path)
+    except Exception:
+        return None
+    df.attrs['server_filters'] = meta.get('server_filters', [])
+    return df
+
+
+def _write_cached_pull(path, df, stamp):
+    """Best-effort parquet (zstd) copy of a pull plus its stamp; skipped without pyarrow."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, compression='zstd')
+        path.with_suffix('.json').write_text(json.dumps(
+            {'stamp': stamp, 'server_filters': df.attrs.get('server_filters', [])}))
+    except Exception:
+        # Non-fatal: mixed-type columns or a read-only location just skip the cache
+        for stale in (path, path.with_suffix('.json')):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def _connect():
+    """
+    Supabase client for the project in SUPABASE_URL/SUPABASE_KEY (environment variables
+    or Colab userdata). One client is kept per project and key, so repeated loads reuse its
+    HTTP connection pool instead of opening new connections.
     """
     supabase_url = os.environ.get('SUPABASE_URL')
     supabase_key = os.environ.get('SUPABASE_KEY')
@@ -24,269 +194,211 @@ def load_supabase_data(table_name='Full Precision Test', show_progress=True, sec
     if not supabase_url or not supabase_key:
         raise RuntimeError('Supabase credentials not set. Please set SUPABASE_URL and SUPABASE_KEY.')
     
-    supabase = create_client(supabase_url, supabase_key)
-    
-    # Paginate through all records
-    page_size = 1000
-    offset = 0
-    all_rows = []
-    
-    if show_progress:
-        print(f"Loading data from Supabase table '{table_name}'...")
-    
-    while True:
-        # Build base query
-        base_query = supabase.table(table_name).select('*')
+    key = (supabase_url, supabase_key)
+    # Streamlit serves sessions on separate threads; make sure only one client gets built
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            # Imported here: the client library is only needed when actually talking to Supabase
+            from supabase import create_client
+            _CLIENTS[key] = create_client(supabase_url, supabase_key)
+            _use_fast_json()
+        return _CLIENTS[key]
+
+
+class _PageQuery:
+    """
+    Builds and runs one page of a filtered table query. Filters on columns the table lacks are
+    dropped; `server_filters` collects the filters the client library accepted.
+    """
+    def __init__(self, supabase, table_name, sectors=None, exclude_fossil_fuels=False,
+                 columns=None, required=None, positive=None, years=None):
+        self.supabase = supabase
+        self.table_name = table_name
+        self.sectors = sectors
+        self.exclude_fossil_fuels = exclude_fossil_fuels
+        self.select_clause = _select_clause(supabase, table_name, columns)
+        table_columns = _table_columns(supabase, table_name) if (required or positive or years) else None
+        self.required = [col for col in required or () if col in table_columns] if table_columns else []
+        self.positive = [col for col in positive or () if col in table_columns] if table_columns else []
+        self.years = tuple(years) if years else None
+        # Prefer an (indexable) year column; otherwise compare dates, which also works on ISO text
+        self.year_column = next((col for col in YEAR_COLUMNS if table_columns and col in table_columns), None)
+        self.server_filters = set()
+
+    def key(self):
+        """Everything that determines the result, for cache keys."""
+        return (getattr(self.supabase, 'supabase_url', None), self.table_name, self.select_clause,
+                self.sectors, self.exclude_fossil_fuels, self.required, self.positive, self.years)
+
+    def __call__(self, offset, count=None):
+        # Builders are mutated by .range(), so each page gets a freshly built query
+        base_query = self.supabase.table(self.table_name).select(self.select_clause, count=count)
         # Apply server-side sector filter if provided. Uses the exact DB column name.
         # Column is renamed later to "Scott's Sector (5)" by the loader.
-        if sectors:
+        if self.sectors:
             try:
-                base_query = base_query.in_('Scotts_Sector_5', sectors)
+                base_query = base_query.in_('Scotts_Sector_5', self.sectors)
+                self.server_filters.add('sectors')
             except Exception:
                 # If server-side filter isn't supported, we'll filter client-side later
                 pass
-
-        # Fetch a page of data
-        response = base_query.range(offset, offset + page_size - 1).execute()
-        
-        batch = response.data if hasattr(response, 'data') else response
-        
-        if not batch:
-            break
-        
-        all_rows.extend(batch)
-        if show_progress:
-            print(f"Loaded {len(all_rows)} records so far...")
-        
-        # If we got fewer records than page_size, we're done
-        if len(batch) < page_size:
-            break
-        
-        offset += page_size
-    
-    if show_progress:
-        print(f"Total records loaded: {len(all_rows)}")
-    
-    return pd.DataFrame(all_rows)
-    
-    def load_market_data(self, 
-                        table_name: str = 'market_data',
-                        year_filter: Optional[int] = None,
-                        restrict_fossil_fuels: bool = False) -> pd.DataFrame:
-        """
-        Load market data from Supabase table.
-        
-        Args:
-            table_name: Name of the table containing market data
-            year_filter: Optional year to filter data (if None, loads all years)
-            restrict_fossil_fuels: Whether to exclude fossil fuel companies
-            
-        Returns:
-            DataFrame with market data
-        """
-        try:
-            # Fetch all rows with pagination to avoid default page limits
-            page_size = 1000
-            offset = 0
-            rows = []
-
-            # If a year filter is provided, filter by Date range on the server if possible
-            # Note: Column name uses exact case as in the DB schema ("Date")
-            base_query = self.client.table(table_name).select("*")
-            if year_filter:
-                start_date = f"{year_filter}-01-01"
-                end_date = f"{year_filter}-12-31"
-                base_query = base_query.gte('Date', start_date).lte('Date', end_date)
-
-            # Use ID ordering for deterministic pagination if available
-            # If "ID" column doesn't exist, pagination will still work without ordering
+        # Exclude fossil-fuel industries; rows without an industry are kept, as client-side
+        if self.exclude_fossil_fuels:
             try:
-                base_query = base_query.order('ID', desc=False)
+                not_fossil = ','.join(f'FactSet_Industry.not.ilike.*{kw}*' for kw in FOSSIL_KEYWORDS)
+                base_query = base_query.or_(f'FactSet_Industry.is.null,and({not_fossil})')
+                self.server_filters.add('fossil')
             except Exception:
                 pass
-
-            while True:
-                try:
-                    response = base_query.range(offset, offset + page_size - 1).execute()
-                except Exception as e:
-                    logger.error(f"Error during Supabase pagination (offset={offset}): {e}")
-                    raise
-
-                batch = response.data or []
-                if not batch:
-                    break
-                rows.extend(batch)
-                if len(batch) < page_size:
-                    break
-                offset += page_size
-
-            if not rows:
-                logger.warning(f"No data found in table '{table_name}' with the given filters")
-                return pd.DataFrame()
-
-            # Convert to DataFrame
-            df = pd.DataFrame(rows)
-            
-            # Apply fossil fuel restrictions if needed
-            if restrict_fossil_fuels:
-                df = self._apply_fossil_fuel_filter(df)
-            
-            # Clean and standardize column names
-            df = self._clean_dataframe(df)
-            
-            # Filter out rows with missing essential data
-            df = self._filter_incomplete_data(df)
-            
-            logger.info(f"Loaded {len(df)} records from Supabase after filtering")
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error loading data from Supabase: {e}")
-            raise
-    
-    def _apply_fossil_fuel_filter(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply fossil fuel industry filter to dataframe."""
-        import re
-        possible_cols = ['FactSet_Industry', 'factset_industry', 'FactSet Industry']
-        industry_col = None
-        for col in possible_cols:
-            if col in df.columns:
-                industry_col = col
-                break
-        if industry_col is None:
-            logger.warning(f"Column 'FactSet_Industry' not found. Fossil fuel filtering skipped.")
-            return df
-        # Excluded industries (normalized)
-        excluded_industries = [
-            "integratedoil",
-            "oilfieldservicesequipment",
-            "oilgasproduction",
-            "coal",
-            "oilrefiningmarketing"
-        ]
-        # Normalize function: lowercase and remove non-alphanumeric
-        def normalize(s):
-            return re.sub(r'[^a-z0-9]', '', str(s).lower())
-        # Apply normalization to both data and excluded list
-        industry_norm = df[industry_col].apply(normalize)
-        excluded_norm = set(excluded_industries)
-        mask = ~industry_norm.isin(excluded_norm)
-        filtered_df = df[mask].copy()
-        removed_count = len(df) - len(filtered_df)
-        logger.info(f"Filtered out {removed_count} fossil fuel companies from {len(df)} total records")
-        return filtered_df
-    
-    def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and standardize DataFrame format."""
-        # Strip whitespace from column names
-        df.columns = df.columns.str.strip()
-        
-        # Remove duplicate columns
-        df = df.loc[:, ~df.columns.duplicated(keep='first')]
-        
-        # Replace common null representations
-        df.replace({'--': None, '': None, 'N/A': None, '#N/A': None, 'NULL': None, 'null': None}, inplace=True)
-        
-        # Ensure ticker column exists
-        if 'ticker' not in df.columns and 'ticker_region' in df.columns:
-            df['ticker'] = df['ticker_region'].str.split('-').str[0].str.strip()
-        
-        # Ensure year column exists
-        if 'year' not in df.columns and 'date' in df.columns:
-            df['year'] = pd.to_datetime(df['date']).dt.year
-        
-        return df
-    
-    def _filter_incomplete_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Filter out rows with missing essential data after querying.
-        Removes rows where critical columns like price data are missing.
-        """
-        initial_count = len(df)
-        
-        # Define essential columns that must have valid data
-        essential_columns = []
-        
-        # Check for price columns (try multiple possible names)
-        price_columns = ['Ending Price', 'ending_price', 'Price']
-        for col in price_columns:
-            if col in df.columns:
-                essential_columns.append(col)
-                break
-        
-        # Check for ticker columns
-        ticker_columns = ['Ticker', 'ticker', 'Ticker-Region', 'ticker_region']
-        for col in ticker_columns:
-            if col in df.columns:
-                essential_columns.append(col)
-                break
-        
-        # Check for date/year columns
-        date_columns = ['Date', 'date', 'Year', 'year']
-        for col in date_columns:
-            if col in df.columns:
-                essential_columns.append(col)
-                break
-        
-        if not essential_columns:
-            logger.warning("No essential columns found for filtering")
-            return df
-        
-        # Filter out rows where essential columns are null or invalid
-        for col in essential_columns:
-            if col in df.columns:
-                # Remove rows where the column is null, empty, or contains invalid values
-                if df[col].dtype in ['float64', 'int64']:
-                    # For numeric columns, remove null, inf, or zero values (for price)
-                    if 'price' in col.lower() or 'Price' in col:
-                        df = df[df[col].notna() & (df[col] > 0) & (df[col] != float('inf'))]
-                    else:
-                        df = df[df[col].notna() & (df[col] != float('inf'))]
+        # Rows the caller would discard anyway never leave the server
+        for col in self.required:
+            try:
+                base_query = base_query.not_.is_(col, 'null')
+            except Exception:
+                pass
+        for col in self.positive:
+            try:
+                base_query = base_query.gt(col, 0)
+            except Exception:
+                pass
+        if self.years:
+            first, last = self.years
+            try:
+                if self.year_column:
+                    base_query = base_query.gte(self.year_column, first).lte(self.year_column, last)
                 else:
-                    # For text columns, remove null or empty strings
-                    df = df[df[col].notna() & (df[col] != '') & (df[col] != '--')]
-        
-        filtered_count = len(df)
-        removed_count = initial_count - filtered_count
-        
-        if removed_count > 0:
-            logger.info(f"Filtered out {removed_count} rows with missing essential data")
-            logger.info(f"Remaining records: {filtered_count}")
-        
-        return df
+                    base_query = base_query.gte('Date', f'{first}-01-01').lt('Date', f'{last + 1}-01-01')
+                self.server_filters.add('years')
+            except Exception:
+                pass
+        return base_query.range(offset, offset + PAGE_SIZE - 1).execute()
+
+
+def _rows(response):
+    return (response.data if hasattr(response, 'data') else response) or []
+
+
+def _iter_responses(fetch_page, count=None):
+    """
+    Page responses in offset order until a short page. The first page is fetched alone: small
+    tables finish there, and it carries the row `count` if one is asked for. The rest are
+    fetched a few at a time so their round trips overlap, but are still yielded on the calling
+    thread, so callbacks (e.g. Streamlit widgets) stay there.
+
+    A count only caps the wave that reaches the expected end, so pages clearly past it are
+    never requested; if it turns out low, full waves resume until the short page.
+    """
+    response = fetch_page(0, count)
+    yield response
+    if len(_rows(response)) < PAGE_SIZE:
+        return
+    total = getattr(response, 'count', None) if count else None
+    # Offset just past the page holding the last expected row
+    expected_end = -(-total // PAGE_SIZE) * PAGE_SIZE if total else None
+    offset = PAGE_SIZE
+    with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as pool:
+        while True:
+            wave_end = offset + PAGE_FETCH_WORKERS * PAGE_SIZE
+            if expected_end is not None and offset < expected_end:
+                wave_end = min(wave_end, expected_end)
+            for response in pool.map(fetch_page, range(offset, wave_end, PAGE_SIZE)):
+                yield response
+                if len(_rows(response)) < PAGE_SIZE:
+                    return
+            offset = wave_end
+
+
+def iter_supabase_data(table_name='Full Precision Test', sectors=None, exclude_fossil_fuels=False, columns=None, required=None, positive=None, years=None):
+    """
+    Yields a Supabase table one page (PAGE_SIZE rows) at a time as DataFrames, for callers that
+    process rows incrementally and shouldn't hold the whole table. Filters are the same as
+    load_supabase_data's; each page's `attrs['server_filters']` lists the ones the server applied.
+    """
+    fetch_page = _PageQuery(_connect(), table_name, sectors=sectors, exclude_fossil_fuels=exclude_fossil_fuels,
+                            columns=columns, required=required, positive=positive, years=years)
+    for response in _iter_responses(fetch_page):
+        batch = _rows(response)
+        if batch:
+            page = pd.DataFrame(batch)
+            page.attrs['server_filters'] = sorted(fetch_page.server_filters)
+            yield page
+
+
+def load_supabase_data(table_name='Full Precision Test', show_progress=True, sectors=None, exclude_fossil_fuels=False, columns=None, on_page=None, required=None, positive=None, years=None, cache_dir=None):
+    """
+    Loads data from a Supabase table and returns it as a pandas DataFrame.
+    Credentials are read from environment variables or Colab userdata.
+    Uses pagination to load all records, fetching pages after the first concurrently
+    (see iter_supabase_data to process pages without concatenating them).
     
-    def get_available_years(self, table_name: str = 'market_data') -> list:
-        """Get list of available years in the database."""
-        try:
-            response = self.client.table(table_name).select("year").execute()
-            years = sorted(set(row['year'] for row in response.data if row['year']))
-            logger.info(f"Available years: {years}")
-            return years
-        except Exception as e:
-            logger.error(f"Error getting available years: {e}")
-            return []
+    Args:
+        table_name (str): Name of the Supabase table to load
+        show_progress (bool): Whether to print loading progress messages
+        sectors (list): Optional sectors to keep, filtered server-side
+        exclude_fossil_fuels (bool): Drop fossil-fuel industries server-side
+        columns (list): Optional column names to fetch; names the table lacks are ignored
+        on_page (callable): Optional on_page(rows_loaded, total_estimate, page_df) called as
+            each page arrives; total_estimate is the server's row estimate (None if unknown)
+        required (list): Optional column names whose NULL rows are dropped server-side;
+            names the table lacks are ignored
+        positive (list): Optional column names whose rows are kept only when > 0 (which also
+            drops NULLs) server-side; names the table lacks are ignored
+        years (tuple): Optional inclusive (first, last) year range, filtered server-side on a
+            year column if the table has one, else on Date
+        cache_dir (str): Optional directory (default: $SUPABASE_CACHE_DIR) for a parquet copy of
+            each pull, reused while the table's latest updated_at is unchanged or, if it has no
+            such column, for CACHE_MAX_AGE seconds
+
+    The returned frame's `attrs['server_filters']` lists the filters the
+    server applied ('sectors', 'fossil', 'years'), so callers can skip re-reporting them.
+    """
+    supabase = _connect()
     
-    def get_available_factors(self, table_name: str = 'market_data') -> list:
-        """Get list of available factor columns in the database."""
-        try:
-            # Get first row to examine columns
-            response = self.client.table(table_name).select("*").limit(1).execute()
-            
-            if not response.data:
-                return []
-            
-            # Filter for factor-related columns (adjust as needed based on your schema)
-            all_columns = list(response.data[0].keys())
-            factor_columns = [col for col in all_columns 
-                            if any(keyword in col.lower() for keyword in 
-                                 ['momentum', 'roe', 'roa', 'price', 'book', 'earns', 'vol', 
-                                  'accrual', 'growth', 'return'])]
-            
-            logger.info(f"Available factors: {factor_columns}")
-            return factor_columns
-            
-        except Exception as e:
-            logger.error(f"Error getting available factors: {e}")
-            return []
+    if show_progress:
+        print(f"Loading data from Supabase table '{table_name}'...")
+
+    fetch_page = _PageQuery(supabase, table_name, sectors=sectors, exclude_fossil_fuels=exclude_fossil_fuels,
+                            columns=columns, required=required, positive=positive, years=years)
 
+    cache_dir = cache_dir or os.environ.get('SUPABASE_CACHE_DIR')
+    if cache_dir:
+        key = hashlib.blake2b(repr(fetch_page.key()).encode(), digest_size=16).hexdigest()
+        cache_path = Path(cache_dir).expanduser() / f'{key}.parquet'
+        stamp = _table_stamp(supabase, table_name)
+        cached = _read_cached_pull(cache_path, stamp)
+        if cached is not None:
+            if show_progress:
+                print(f"Loaded {len(cached)} records from cache ({cache_path})")
+            if on_page is not None:
+                on_page(len(cached), len(cached), cached)
+            return cached
 
+    # Paginate through all records
+    pages = []
+    n_loaded = 0
+    total_estimate = None
+    # The planner's row estimate (cheap, unlike an exact count) drives progress reporting and
+    # keeps the concurrent fetches from running past the end of the table
+    for response in _iter_responses(fetch_page, 'estimated'):
+        batch = _rows(response)
+        if not pages and on_page is not None:
+            total_estimate = getattr(response, 'count', None)
+        if not batch:
+            break
+        # Convert each page to a columnar form right away so the per-row dicts can be freed
+        pages.append(_page_frame(batch))
+        n_loaded += len(batch)
+        if on_page is not None:
+            on_page(n_loaded, total_estimate, _as_frame(pages[-1]))
+        if show_progress:
+            print(f"Loaded {n_loaded} records so far...")
+    
+    if show_progress:
+        print(f"Total records loaded: {n_loaded}")
+    
+    # One concat at the end; never grow a frame page by page
+    df = _concat_pages(pages)
+    df.attrs['server_filters'] = sorted(fetch_page.server_filters)
+    if cache_dir:
+        _write_cached_pull(cache_path, df, stamp)
+    return df
@@ -1,10 +1,40 @@
 from . import factor_function
 
-def get_factors(available_factors):
+# Factor name -> factor class
+FACTOR_CONSTRUCTORS = {
+    "ROE using 9/30 Data": factor_function.ROE,
+    "ROA using 9/30 Data": factor_function.ROA,
+    "6-Mo Momentum %": factor_function.Momentum6m,
+    "12-Mo Momentum %": factor_function.Momentum12m,
+    "1-Mo Momentum %": factor_function.Momentum1m,
+    "Price to Book Using 9/30 Data": factor_function.P2B,
+    "Next FY Earns/P": factor_function.NextFYrEarns,
+    "1-Yr Price Vol %": factor_function.OneYrPriceVol,
+    "Accruals/Assets": factor_function.AccrualsAssets,
+    "ROA %": factor_function.ROAPercentage,
+    "1-Yr Asset Growth %": factor_function.OneYrAssetGrowth,
+    "1-Yr CapEX Growth %": factor_function.OneYrCapEXGrowth,
+    "Book/Price": factor_function.BookPrice,
+}
+
+def _append_factor(factors, name):
+    ctor = FACTOR_CONSTRUCTORS.get(name)
+    if ctor is None:
+        print(f"factor {name} is not available.")
+    else:
+        factors.append((ctor(), name))
+
+def get_factors(available_factors, selections=None):
+    # Non-interactive path: build the requested factors directly by name
+    if selections is not None:
+        factors = []
+        for name in selections:
+            _append_factor(factors, name)
+        return factors
+
     # Display the lists of available factors with index
     print("\nAvailable factors: ")
-    for i in range(len(available_factors)):
-        print(f"{i + 1}. {available_factors[i]}")
+    print("\n".join(f"{i}. {name}" for i, name in enumerate(available_factors, start=1)))
     
     # Get the number of factors user wants to use
     while(True):
@@ -39,35 +69,7 @@ def get_factors(available_factors):
                 break
     
         name = available_factors[selected_factor - 1]
-        # Python 3.9 compatible mapping (no match-case)
-        if name == "ROE using 9/30 Data":
-            factors.append((factor_function.ROE(), name))
-        elif name == "ROA using 9/30 Data":
-            factors.append((factor_function.ROA(), name))
-        elif name == "6-Mo Momentum %":
-            factors.append((factor_function.Momentum6m(), name))
-        elif name == "12-Mo Momentum %":
-            factors.append((factor_function.Momentum12m(), name))
-        elif name == "1-Mo Momentum %":
-            factors.append((factor_function.Momentum1m(), name))
-        elif name == "Price to Book Using 9/30 Data":
-            factors.append((factor_function.P2B(), name))
-        elif name == "Next FY Earns/P":
-            factors.append((factor_function.NextFYrEarns(), name))
-        elif name == "1-Yr Price Vol %":
-            factors.append((factor_function.OneYrPriceVol(), name))
-        elif name == "Accruals/Assets":
-            factors.append((factor_function.AccrualsAssets(), name))
-        elif name == "ROA %":
-            factors.append((factor_function.ROAPercentage(), name))
-        elif name == "1-Yr Asset Growth %":
-            factors.append((factor_function.OneYrAssetGrowth(), name))
-        elif name == "1-Yr CapEX Growth %":
-            factors.append((factor_function.OneYrCapEXGrowth(), name))
-        elif name == "Book/Price":
-            factors.append((factor_function.BookPrice(), name))
-        else:
-            print(f"factor {name} is not available.")
+        _append_factor(factors, name)
     
     return factors
     